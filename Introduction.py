@@ -1,7 +1,10 @@
 # streamlit run "/Users/matteolemesre/Desktop/Data LOSC/Github/Introduction.py"
 import streamlit as st
 
+from utils.warmup import start_warmup
+
 st.set_page_config(page_title="Home - Data LOSC")
+start_warmup()
 
 st.title("Data LOSC")
 
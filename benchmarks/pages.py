@@ -0,0 +1,266 @@
+# python -m benchmarks.pages [season ...] [--case NAME] [--update] [--tolerance 0.5] [--no-memory]
+# Runs each page headlessly with Streamlit's AppTest on representative widget states and times the
+# load, filter, merge and render phases marked in the page (utils/profiling.py). Each case is run once
+# with empty caches (cold) and once more right after (warm); the peak memory of each phase is taken
+# from a separate traced cold run, as tracemalloc slows the page down. Results are compared with
+# benchmarks/baseline.json; --update rewrites it. Exits with 1 when a case is slower than the baseline
+# by more than the tolerance. The timings depend on the machine, so the baseline is not committed:
+# record it once with --update before comparing. The background warm-up of utils/warmup.py is turned
+# off for the runs.
+import json
+import logging
+import os
+import sys
+import time
+import tracemalloc
+import warnings
+
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+from utils.data import SEASONS, season_path
+from utils.profiling import PHASES, RECORDS_KEY, close_records
+
+PAGES_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "pages")
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TIMEOUT = 300
+
+# Slowdowns under these are noise, whatever the tolerance
+MIN_SECONDS = 0.05
+MIN_MB = 5.0
+
+# Widget values resolved from the options of the widget: every option, or the first one
+ALL = "<all>"
+FIRST = "<first>"
+
+BIG5 = "Big 5 + UCL + UEL + UECL"
+
+# Pages without a season selector, run once
+CROSS_SEASON_PAGES = {"Player trajectory.py"}
+
+# ------------------------- Cases -------------------------
+# (name, page, [(widget kind, label, value), ...]); the season is selected first when the page has one
+CASES = [
+    ("top-players/all", "Top-performing players.py", [
+        ("slider", "Number of players to display", 100),
+    ]),
+    ("top-players/gk", "Top-performing players.py", [
+        ("checkbox", "All positions", False), ("selectbox", "Choose a position", "GK"),
+        ("slider", "Number of players to display", 100),
+    ]),
+    ("top-players/form", "Top-performing players.py", [
+        ("checkbox", "All matchdays", False), ("radio", "Matchdays", "Last matchdays"),
+        ("slider", "Number of players to display", 100),
+    ]),
+    ("match/all", "Top Individual Match Performances.py", [
+        ("multiselect", "Position", ALL), ("slider", "Number of top performances to display", 100),
+    ]),
+    ("match/gk", "Top Individual Match Performances.py", [
+        ("multiselect", "Position", ["GK"]), ("slider", "Number of top performances to display", 100),
+    ]),
+    ("season/all", "Top Individual Season Performances.py", [
+        ("multiselect", "League Group", [BIG5]), ("multiselect", "Position", ALL),
+        ("slider", "Number of top players to display", 100),
+    ]),
+    ("season/gk", "Top Individual Season Performances.py", [
+        ("multiselect", "League Group", [BIG5]), ("multiselect", "Position", ["GK"]),
+        ("slider", "Number of top players to display", 100),
+    ]),
+    ("season/others", "Top Individual Season Performances.py", [
+        ("multiselect", "League Group", ["Others Leagues"]), ("multiselect", "Position", ALL),
+        ("slider", "Number of top players to display", 100),
+    ]),
+    ("metrics/all", "Performance Metrics.py", [
+        ("multiselect", "League Group", [BIG5]), ("multiselect", "Position", ALL),
+        ("slider", "Number of top players to display", 100),
+    ]),
+    ("metrics/gk", "Performance Metrics.py", [
+        ("multiselect", "League Group", [BIG5]), ("multiselect", "Position", ["GK"]),
+        ("slider", "Number of top players to display", 100),
+    ]),
+    ("metrics/as-of", "Performance Metrics.py", [
+        ("multiselect", "League Group", [BIG5]),
+        ("radio", "Indices", "Estimated as of a matchday"), ("selectbox", "Matchday", "J19"),
+        ("multiselect", "Position", ALL), ("slider", "Number of top players to display", 100),
+    ]),
+    ("player/outfield", "Individual player performances.py", [
+        ("multiselect", "League Group", [BIG5]), ("multiselect", "Position", ["DF", "MF", "MO", "FW"]),
+        ("multiselect", "Players", FIRST),
+    ]),
+    ("player/gk", "Individual player performances.py", [
+        ("multiselect", "League Group", [BIG5]), ("multiselect", "Position", ["GK"]),
+        ("multiselect", "Players", FIRST),
+    ]),
+    ("ratings/all", "Individual player ratings.py", [
+        ("multiselect", "League", ALL), ("multiselect", "Game Week", FIRST), ("multiselect", "Match", ALL),
+    ]),
+    ("teams/all", "Team Performances.py", [
+        ("multiselect", "League Group", [BIG5]), ("multiselect", "Select Teams", FIRST),
+    ]),
+    ("teams/window", "Team Performances.py", [
+        ("multiselect", "League Group", [BIG5]), ("select_slider", "Matchdays", ("J30", "J38")),
+        ("radio", "Matches", "Home"), ("multiselect", "Select Teams", FIRST),
+    ]),
+    ("similar/fw", "Similar players.py", [
+        ("selectbox", "League Group", BIG5), ("selectbox", "Position", "FW"), ("selectbox", "Player", FIRST),
+    ]),
+    ("trajectory", "Player trajectory.py", [
+        ("multiselect", "League Group", [BIG5]), ("selectbox", "Player", FIRST),
+    ]),
+]
+
+
+def seasons_with_data() -> list:
+    seasons = []
+    for season, season_code in SEASONS.items():
+        folder = season_path(season_code, "ratings")
+        if os.path.isdir(folder) and any(name.endswith(".csv") for name in os.listdir(folder)):
+            seasons.append(season)
+    return seasons
+
+
+# ------------------------- Runs -------------------------
+def resolve(widget, value):
+    multi = widget.type == "multiselect"
+    if value == ALL:
+        return list(widget.options)
+    if value == FIRST:
+        return list(widget.options[:1]) if multi else widget.options[0]
+    return value
+
+
+def set_widgets(at, steps, season=None):
+    if season and at.sidebar.selectbox and at.sidebar.selectbox[0].label == "Season":
+        at.sidebar.selectbox[0].set_value(season)
+        at.run()
+    for kind, label, value in steps:
+        widgets = [w for w in getattr(at.sidebar, kind) if w.label == label]
+        if not widgets:
+            raise LookupError(f"no {kind} '{label}'")
+        widgets[0].set_value(resolve(widgets[0], value))
+        at.run()
+    if at.exception:
+        raise RuntimeError(at.exception[0].value)
+
+
+def timed_run(at) -> dict:
+    start = time.perf_counter()
+    at.run(timeout=TIMEOUT)
+    end = time.perf_counter()
+    records = close_records(list(at.session_state[RECORDS_KEY]), end) if RECORDS_KEY in at.session_state else []
+    # Steps are timed inside their phase: only the phases are compared
+    records = [record for record in records if "step" not in record]
+    result = {"total": round(end - start, 3)}
+    for record in records:
+        result[record["phase"]] = round(result.get(record["phase"], 0) + record["seconds"], 3)
+    result["peak_mb"] = {record["phase"]: record["peak_mb"] for record in records if "peak_mb" in record}
+    return result
+
+
+def clear_caches():
+    st.cache_data.clear()
+    st.cache_resource.clear()
+
+
+def run_case(page, steps, season=None, memory=True) -> dict:
+    at = AppTest.from_file(os.path.join(PAGES_ROOT, page), default_timeout=TIMEOUT)
+    at.run()
+    set_widgets(at, steps, season)
+
+    clear_caches()
+    cold = timed_run(at)
+    warm = timed_run(at)
+    cold.pop("peak_mb")
+    warm.pop("peak_mb")
+    result = {"cold": cold, "warm": warm}
+
+    if memory:
+        clear_caches()
+        tracemalloc.start()
+        try:
+            result["peak_mb"] = timed_run(at)["peak_mb"]
+        finally:
+            tracemalloc.stop()
+    return result
+
+
+# ------------------------- Baseline -------------------------
+def load_baseline() -> dict:
+    if not os.path.exists(BASELINE_PATH):
+        return {}
+    with open(BASELINE_PATH) as f:
+        return json.load(f)
+
+
+def regressions(result: dict, baseline: dict, tolerance: float) -> list:
+    found = []
+    for run in ("cold", "warm"):
+        for key in ("total",) + PHASES:
+            new, old = result[run].get(key), baseline.get(run, {}).get(key)
+            if new is not None and old is not None and new > old * (1 + tolerance) and new - old > MIN_SECONDS:
+                found.append(f"{run} {key} {old:.3f}s -> {new:.3f}s")
+    for key, new in result.get("peak_mb", {}).items():
+        old = baseline.get("peak_mb", {}).get(key)
+        if old is not None and new > old * (1 + tolerance) and new - old > MIN_MB:
+            found.append(f"{key} peak {old:.1f} MB -> {new:.1f} MB")
+    return found
+
+
+def format_result(result: dict) -> str:
+    parts = [f"cold {result['cold']['total']:.2f}s", f"warm {result['warm']['total']:.2f}s"]
+    phases = [f"{key} {result['cold'][key]:.2f}s/{result.get('peak_mb', {}).get(key, 0):.0f}MB" for key in PHASES if key in result["cold"]]
+    return " | ".join(parts + phases)
+
+
+# ------------------------- Command line -------------------------
+def option(name, default=None):
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+
+def main() -> int:
+    flags_with_values = {"--case", "--tolerance"}
+    args = [
+        arg for i, arg in enumerate(sys.argv[1:], 1)
+        if not arg.startswith("--") and sys.argv[i - 1] not in flags_with_values
+    ]
+    seasons = args or seasons_with_data()
+    case_filter = option("--case")
+    tolerance = float(option("--tolerance", 0.5))
+    memory = "--no-memory" not in sys.argv
+    update = "--update" in sys.argv
+
+    baseline = load_baseline()
+    if not baseline and not update:
+        print(f"No baseline at {BASELINE_PATH}: run with --update to record one on this machine")
+    results = {}
+    failed = False
+    for name, page, steps in CASES:
+        if case_filter and not name.startswith(case_filter):
+            continue
+        for season in [None] if page in CROSS_SEASON_PAGES else seasons:
+            key = f"{name} [{season}]" if season else name
+            try:
+                result = run_case(page, steps, season, memory)
+            except Exception as e:
+                print(f"{key}: ERROR {e}")
+                failed = True
+                continue
+            results[key] = result
+            found = regressions(result, baseline[key], tolerance) if key in baseline and not update else []
+            status = "REGRESSION " + "; ".join(found) if found else ("new" if key not in baseline else "ok")
+            print(f"{key}: {format_result(result)} -> {status}")
+            failed |= bool(found)
+
+    if update:
+        with open(BASELINE_PATH, "w") as f:
+            json.dump({**baseline, **results}, f, indent=2, sort_keys=True)
+        print(f"Baseline written to {BASELINE_PATH}")
+        return 0
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    os.environ["WARMUP"] = "0"
+    warnings.filterwarnings("ignore")
+    logging.disable(logging.CRITICAL)
+    sys.exit(main())
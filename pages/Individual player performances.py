@@ -1,113 +1,78 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import os
+
+from utils.data import select_season, load_centiles, load_all_ratings
+from utils.players import load_player_dimension, load_player_profiles, player_profile
+from utils.percentiles import peer_percentiles, peer_group_mask
+from utils.profiling import phase, rows, show_profile, step
+from utils.radar import get_features, radar_series, select_radar_mode, show_radar
+from utils.search import load_name_index, search_players
+from utils.warmup import start_warmup
 
 # ------------------------- Functions -------------------------
-def get_features_for_players(positions):
-    features = set()
-    for pos in positions:
-        if pos in ['FW', 'MO']:
-            features.update([
-                'Goals', 'Efficiency', '% Take-Ons', 'Actions created',
-                'Expected Assists (xA)', "Actions in the Penalty Area", 'Key Passes',
-                '% Aerial Duels', 'Progressive Actions (Total)', 'Successful Take-Ons'
-            ])
-        elif pos == 'MF':
-            features.update([
-                'Progressive Actions (Total)', 'Interceptions', 'Tackles Won',
-                'Blocks', 'Ball Recoveries', 'Key Passes',
-                'Fouls Committed', '% Tackles/Duels', 'Touches Middle Third', '% Aerial Duels'
-            ])
-        elif pos == 'DF':
-            features.update([
-                'Clearances', 'Blocks', 'Interceptions', '% Aerial Duels',
-                'Touches', 'Fouls Committed', 'Aerial Duels Won',
-                'Progressive Passes', 'Ball Recoveries', '% Tackles/Duels'
-            ])
-    return list(features)
-
-def get_features_for_goalkeepers():
-    return [
-        'Clean Sheets', 'Crosses Stopped', 'Sweeper Actions', 'Saves',
-        'Goals Against', 'Efficiency', 'Penalties Winner', '% Saves', '% Long Passes', 
-        '% Crosses Stopped'
-    ]
-
-def get_features(positions):
-    if 'GK' in positions:
-        return get_features_for_goalkeepers()
-    else:
-        return get_features_for_players(positions)
-
-def get_df(leagues_name, path_folder, positions):
+def get_df(leagues_name, season_code, positions):
     try:
-        file_suffix = "_centiles_gk.csv" if 'GK' in positions else "_centiles.csv"
-        df_path = os.path.join(path_folder, f"centiles/{leagues_name}{file_suffix}")
-        df_radar = pd.read_csv(df_path)
+        df_radar = load_centiles(season_code, leagues_name, goalkeepers='GK' in positions)
         df_radar.rename(columns={df_radar.columns[0]: "Player"}, inplace=True)
         return df_radar
     except FileNotFoundError:
-        st.error(f"Data file for league '{leagues_name}' not found in folder '{path_folder}'. Please check your selections and data.")
+        st.error(f"Data file for league '{leagues_name}' not found for season '{season_code}'. Please check your selections and data.")
         return pd.DataFrame()
-    
-import os
-import pandas as pd
 
-def get_average_scores(positions, path_folder):
-    if 'GK' in positions:
-        path = os.path.join(path_folder, "ratings/data_goals.csv")
-    else:
-        path = os.path.join(path_folder, "ratings/data_players.csv")
-
-    df = pd.read_csv(path)
-    
-    df = df.dropna(subset=['Rating', 'Minutes'])
-    df['Rating'] = pd.to_numeric(df['Rating'], errors='coerce')
-    df['Minutes'] = pd.to_numeric(df['Minutes'], errors='coerce')
-    df = df[df['Minutes'] > 0]
-
-    df['WeightedRating'] = df['Rating'] * df['Minutes']
-    grouped = df.groupby('Player').agg({
-        'WeightedRating': 'sum',
-        'Minutes': 'sum',
-        'Team': lambda x: ', '.join(sorted(set(x))),
-        'League': lambda x: ', '.join(sorted(set(x)))
-    }).reset_index()
-
-    grouped['Average Rating'] = grouped['WeightedRating'] / grouped['Minutes']
-    grouped.rename(columns={'Team': 'Team(s)', 'League': 'League(s)'}, inplace=True)
-    return grouped[['Player', 'Average Rating', 'Team(s)', 'League(s)']]
-
-
-def plot_radar(players_data, features, players):
-    if len(features) < 3:
-        st.warning("Please select at least 3 features for a proper radar chart display.")
-        return
+def get_average_scores(season_code):
+    # Minutes-weighted average rating, team(s) and league(s) from the player dimension
+    df_dim = load_player_dimension(season_code)
+    return df_dim[["Weighted Rating", "Team(s)", "League(s)"]].rename(columns={"Weighted Rating": "Average Rating"}).reset_index()
+
+
+def apply_peer_group(df_radar, leagues_name, season_code, positions, selected_players):
+    st.sidebar.markdown("---")
+    if not st.sidebar.checkbox("Custom peer group", value=False):
+        return df_radar
+
+    df_adj = load_centiles(season_code, leagues_name, "adjusted", goalkeepers='GK' in positions)
+    all_positions = sorted(df_adj["Position"].unique())
+    peer_positions = st.sidebar.multiselect("Peer positions", all_positions, default=[pos for pos in positions if pos in all_positions])
 
-    angles = np.linspace(0, 2 * np.pi, len(features), endpoint=False).tolist()
-    angles += angles[:1]
+    peer_players = None
+    if leagues_name == "TopLeagues":
+        df_leagues = load_all_ratings(season_code, columns=("Player", "League"))
+        peer_league = st.sidebar.selectbox("Peer league", ["All leagues"] + sorted(df_leagues["League"].dropna().unique()))
+        if peer_league != "All leagues":
+            peer_players = df_leagues.loc[df_leagues["League"] == peer_league, "Player"].unique()
 
-    fig, ax = plt.subplots(figsize=(6, 6), subplot_kw={"projection": "polar"})
+    min_minutes = st.sidebar.slider("Peer minimum minutes", 0, 4000, 0)
+    age_range = st.sidebar.slider("Peer age range", 15, 50, (15, 50))
 
-    for player in players:
-        values = players_data.loc[players_data["Player"] == player, features].values.flatten().tolist()
-        if len(values) != len(features):
-            st.warning(f"Not enough data for player {player} to plot radar.")
-            continue
-        values += values[:1]
-        ax.plot(angles, values, label=player, linewidth=2)
-        ax.fill(angles, values, alpha=0.1)
+    if age_range == (15, 50):
+        age_range = None
 
-    ax.set_xticks(angles[:-1])
-    ax.set_xticklabels(features, fontsize=10)
-    ax.set_yticklabels([])
-    ax.legend(loc="upper right", bbox_to_anchor=(1.3, 1.1))
-    st.pyplot(fig)
+    mask = peer_group_mask(df_adj, peer_positions, peer_players, min_minutes, age_range)
+    st.sidebar.caption(f"{int(mask.sum())} players in the peer group")
+
+    id_columns = ['Player', 'Nation', 'Position', 'Team', 'Age', 'Born', 'Matches Played', 'Starts', 'Minutes Played']
+    stats = [col for col in df_radar.columns if col in df_adj.columns and col not in id_columns]
+    df_targets = df_adj[df_adj["Player"].isin(selected_players)].drop_duplicates("Player").set_index("Player")
+    df_peer = peer_percentiles(df_adj[mask], df_targets, stats)
+
+    df_radar = df_radar.copy()
+    in_peer = df_radar["Player"].isin(df_peer.index)
+    df_radar.loc[in_peer, stats] = df_peer.loc[df_radar.loc[in_peer, "Player"], stats].to_numpy()
+    return df_radar
+
+def plot_radar(players_data, features, players, mode):
+    if len(features) < 3:
+        st.warning("Please select at least 3 features for a proper radar chart display.")
+        return
+
+    series, missing = radar_series(players_data, "Player", players, features)
+    for player in missing:
+        st.warning(f"Not enough data for player {player} to plot radar.")
+    show_radar(features, series, mode)
 
 # ------------------------- Streamlit App -------------------------
 st.set_page_config(page_title="Individual Player Performances")
+start_warmup()
 st.sidebar.title("Select Parameters")
 
 st.title("Individual Player Performances")
@@ -117,22 +82,11 @@ st.markdown("""This page allows you to explore individual player performances fr
 - You can also choose players from **Other Leagues** such as the Argentine Primera, Brazilian Série A, Dutch Eredivisie, MLS, Portuguese Primeira Liga, Copa Libertadores, English Championship, Italian Serie B, Liga MX, and Belgian Pro League. For players from these other leagues, only the performance stats will be shown — **no match rating is available**.
 """)
 
-selected_season = st.sidebar.selectbox("Season", ["2025-2026", "2024-2025", "2023-2024"], index=1)
-
-season = None
-if selected_season == "2023-2024":
-    season_code = "23_24"
-elif selected_season == "2024-2025":
-    season_code = "24_25"
-elif selected_season == "2025-2026":
-    season_code = "25_26"
+season_code = select_season()
 
 if season_code:
-    path_folder = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "csv", f"csv{season_code}"))
-    
-    df_scores_players = pd.read_csv(os.path.join(path_folder, "ratings/data_players.csv"))
-    df_scores_goalkeepers = pd.read_csv(os.path.join(path_folder, "ratings/data_goals.csv"))
-    df_scores = pd.concat([df_scores_players, df_scores_goalkeepers], ignore_index=True)
+    phase("load")
+    df_scores = rows(load_all_ratings(season_code))
 
     selected_leagues = st.sidebar.multiselect("League Group", ["Big 5 + UCL + UEL + UECL", "Others Leagues"])
     leagues_name = ""
@@ -147,23 +101,27 @@ if season_code:
         positions = st.sidebar.multiselect("Position", df_scores['Position'].unique())
 
         if positions:
-            df_radar = get_df(leagues_name, path_folder, positions)
+            df_radar = get_df(leagues_name, season_code, positions)
             if df_radar.empty:
                 st.stop()
 
             selected_features = get_features(positions)
 
-            file_name = f"{leagues_name}_aggregated_gk.csv" if 'GK' in positions else f"{leagues_name}_aggregated.csv"
-            df_global_path = os.path.join(path_folder, f"centiles/{file_name}")
-            df_global = pd.read_csv(df_global_path)
+            df_global = load_centiles(season_code, leagues_name, "aggregated", goalkeepers='GK' in positions)
             df_global = df_global[df_global['Matches Played'] > 0].copy()
 
-            filtered_players = df_radar[df_radar['Position'].isin(positions)]
-            players_all = filtered_players['Player'].unique().tolist()
+            # Only the best matches of the name search are sent to the browser, plus the players already selected
+            name_index = load_name_index(season_code, leagues_name, goalkeepers='GK' in positions)
+            query = st.sidebar.text_input("Search players", placeholder="Player or team name")
+            valid_players = set(df_radar.loc[df_radar['Position'].isin(positions), 'Player'])
+            kept = [player for player in st.session_state.get("selected_players", []) if player in valid_players]
+            options = list(dict.fromkeys(kept + search_players(name_index, query, positions)))
 
-            selected_players = st.sidebar.multiselect("Players", players_all)
+            selected_players = st.sidebar.multiselect("Players", options, key="selected_players")
 
             if selected_players:
+                phase("filter")
+                df_radar = apply_peer_group(df_radar, leagues_name, season_code, positions, selected_players)
                 df_global = df_global[df_global['Player'].isin(selected_players)]
                 
                 show_ratings = leagues_name == "TopLeagues"
@@ -178,11 +136,10 @@ if season_code:
                     df_global["Nation"] = df_global["Player"].map(nationality_map)
                 else:
                     df_global["Nation"] = df_global["Player"].map(nationality_map)
-                df_global["Nation"] = df_global["Nation"].astype(str).str.split(" ").str[1]
                 
+                phase("merge")
                 if show_ratings:
-                    df_global_agg = df_global.groupby('Player', as_index=False).sum()
-                    df_averages = get_average_scores(positions, path_folder)
+                    df_averages = get_average_scores(season_code)
                     df_global = df_global.merge(df_averages, on='Player', how='left')
 
                     if 'GK' in positions:
@@ -194,47 +151,36 @@ if season_code:
                     df_display = df_global[columns].set_index('Player').sort_values('Average Rating', ascending=False).round(2)
                     st.dataframe(df_display, use_container_width=True)
                 else:
-                    df_global_agg = df_global.groupby('Player', as_index=False).sum()
+                    # One row per player in the aggregated files
+                    df_global_agg = df_global.sort_values('Player')
 
                     if 'GK' in positions:
                         columns = ['Player', 'Age', 'Nation', 'Matches Played', 'Minutes Played', 'Goals Against', 'Clean Sheets', 'Team']
                     else:
                         columns = ['Player', 'Age', 'Nation', 'Matches Played', 'Minutes Played', 'Goals', 'Assists', 'Yellow Cards', 'Red Cards', 'Team']
 
-                    df_global_agg["Age"] = df_global_agg["Age"].astype(str).str.split("-").str[0].astype(int)
                     df_display = df_global_agg[columns].set_index('Player').round(2)
                     df_display = df_display.rename(columns={"Team": "Team(s)"})
                     st.dataframe(df_display, use_container_width=True)
 
+                phase("render")
                 st.subheader("📌 Player Radar Statistics")
                 if selected_players and selected_features:
-                    plot_radar(df_radar, selected_features, selected_players)
-                    df_selected = df_radar[df_radar["Player"].isin(selected_players)][["Player"] + selected_features].set_index("Player")
+                    radar_mode = select_radar_mode()
+                    with step("radar chart"):
+                        plot_radar(df_radar, selected_features, selected_players, radar_mode)
+                    df_selected = df_radar[df_radar["Player"].isin(selected_players)][["Player"] + selected_features].astype({"Player": str}).set_index("Player")
                     st.subheader("📈 Player Percentiles")
                     st.dataframe(df_selected.T)
 
                     st.subheader("🧮 Adjusted Stats + Percentiles (All Features)")
+                    # Adjusted rows and valid stats are looked up by player in the cached profile store
+                    df_adj, valid_stats = load_player_profiles(season_code, leagues_name, goalkeepers='GK' in positions)
+                    df_percentiles = df_radar.drop_duplicates("Player").set_index("Player")
                     for player in selected_players:
-                        file_name = f"{leagues_name}_adjusted_gk.csv" if 'GK' in positions else f"{leagues_name}_adjusted.csv"
-                        df_adj_path = os.path.join(path_folder, f"centiles/{file_name}")
-                        df_adj = pd.read_csv(df_adj_path)
-                        stats_absolute = df_adj[df_adj["Player"] == player].copy()
-                        stats_percentiles = df_radar[df_radar["Player"] == player].copy()
-
-                        common_stats = [col for col in stats_percentiles.columns if col in stats_absolute.columns and col not in ['Player', 'Position']]
-                        deleted_stats = ['Matches Played', 'Minutes Played', 'Age', 'Nation', 'Born', 'Squad', 'Team(s)', 'Starts']
-
-                        valid_stats = []
-                        for stat in common_stats:
-                            if stat not in deleted_stats:
-                                if not (stats_absolute[stat].isnull().all() or stats_absolute[stat].sum() == 0):
-                                    valid_stats.append(stat)
-
-                        df_combined = pd.DataFrame({
-                            "Stat": valid_stats,
-                            "Per 90 min or Percentage": [stats_absolute[stat].values[0] for stat in valid_stats],
-                            "Percentile": [stats_percentiles[stat].values[0] for stat in valid_stats]
-                        }).set_index("Stat")
+                        df_combined = player_profile(df_adj, valid_stats, df_percentiles, player)
 
                         st.markdown(f"### 🔎 {player}")
-                        st.dataframe(df_combined.sort_index(), use_container_width=True)
\ No newline at end of file
+                        st.dataframe(df_combined.sort_index(), use_container_width=True)
+
+show_profile()
@@ -1,6 +1,10 @@
 import streamlit as st
 import pandas as pd
-import os
+
+from utils.data import select_season, load_ratings, load_league_games
+from utils.fixtures import load_match_sheets, match_sheet
+from utils.profiling import phase, rows, show_profile
+from utils.warmup import start_warmup
 
 # ------------------------- Functions -------------------------
 def add_average(df):
@@ -10,19 +14,20 @@ def add_average(df):
     df_result.loc["Average"] = avg
     return df_result
 
-def load_league_file(path, league):
-    file_path = os.path.join(path, f"{league}_games.csv")
-    if not os.path.exists(file_path):
+def load_league_file(season_code, league):
+    try:
+        return load_league_games(season_code, league)
+    except FileNotFoundError:
         st.error(f"No file found for {league}")
         st.stop()
-    return pd.read_csv(file_path)
 
-def get_match_info(df, home, away):
-    match = df[(df["Home Team"] == home) & (df["Away Team"] == away)]
-    return match.iloc[0] if not match.empty else {}
+def get_match_info(matches, match_label):
+    # matches: the week's fixtures indexed by their first "Home vs Away" label
+    return matches.loc[match_label] if match_label in matches.index else {}
 
 # ------------------------- Streamlit App -------------------------
 st.set_page_config(page_title="Individual Player Ratings")
+start_warmup()
 st.title("Individual Player Ratings")
 st.markdown("""
 This page lets you explore **individual player ratings** for selected matches across different leagues and matchdays.
@@ -35,31 +40,17 @@ This page lets you explore **individual player ratings** for selected matches ac
 
 st.sidebar.title("Select Parameters")
 
-selected_season = st.sidebar.selectbox("Season", ["2025-2026", "2024-2025", "2023-2024"], index=1)
-
-season = None
-if selected_season == "2023-2024":
-    season_code = "23_24"
-elif selected_season == "2024-2025":
-    season_code = "24_25"
-elif selected_season == "2025-2026":
-    season_code = "25_26"
+season_code = select_season()
 
-base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "csv", f"csv{season_code}"))
-path_players = os.path.join(base_path, "ratings", "data_players.csv")
-path_goalkeepers = os.path.join(base_path, "ratings", "data_goals.csv")
-path_leagues = os.path.join(base_path, "leagues_games")
-
-df_players = pd.read_csv(path_players)
-df_gk = pd.read_csv(path_goalkeepers)
-df_all = pd.concat([df_players, df_gk], ignore_index=True)
+phase("load")
+df_players = rows(load_ratings(season_code))
 
 available_leagues = df_players["League"].dropna().unique().tolist()
 selected_leagues = st.sidebar.multiselect("League", available_leagues)
 
 if selected_leagues:
     df_games = pd.concat(
-        [load_league_file(path_leagues, league).assign(League=league) for league in selected_leagues],
+        [load_league_file(season_code, league).assign(League=league) for league in selected_leagues],
         ignore_index=True
     )
 
@@ -67,12 +58,17 @@ if selected_leagues:
     selected_weeks = st.sidebar.multiselect("Game Week", available_weeks)
 
     if selected_weeks:
-        df_week = df_games[df_games["Game Week"].isin(selected_weeks)]
+        phase("filter")
+        df_week = rows(df_games[df_games["Game Week"].isin(selected_weeks)])
 
         df_week["Match Label"] = df_week["Home Team"] + " vs " + df_week["Away Team"]
         match_labels = df_week["Match Label"].tolist()
         selected_matches = st.sidebar.multiselect("Match", match_labels)
+        matches = df_week.drop_duplicates("Match Label").set_index("Match Label")
 
+        phase("render")
+        # Rating rows grouped by (League, Game Week, Team) once per season
+        sheets = load_match_sheets(season_code) if selected_matches else None
         for match_label in selected_matches:
             try:
                 home_team, away_team = match_label.split(" vs ")
@@ -80,7 +76,7 @@ if selected_leagues:
                 st.warning(f"Invalid match format: {match_label}")
                 continue
 
-            match_info = get_match_info(df_week, home_team, away_team)
+            match_info = get_match_info(matches, match_label)
             league = match_info.get("League", "N/A")
             game_week = match_info.get("Game Week", "N/A")
 
@@ -89,24 +85,16 @@ if selected_leagues:
                      f"**Referee:** {match_info.get('Referee', 'N/A')} | **Attendance:** {match_info.get('Attendance', 'N/A')} | "
                      f"**Venue:** {match_info.get('Venue', 'N/A')}")
 
-            df_home = df_all[
-                (df_all["Team"] == home_team) &
-                (df_all["Game Week"] == game_week) &
-                (df_all["League"] == league)
-            ].drop(columns=["ID"], errors="ignore")
-
-            df_away = df_all[
-                (df_all["Team"] == away_team) &
-                (df_all["Game Week"] == game_week) &
-                (df_all["League"] == league)
-            ].drop(columns=["ID"], errors="ignore")
+            df_home = match_sheet(sheets, league, game_week, home_team)
+            df_away = match_sheet(sheets, league, game_week, away_team)
 
             col1, col2 = st.columns(2)
             with col1:
                 st.markdown(f"### {home_team}")
-                st.dataframe(add_average(df_home.sort_values(by="Rating", ascending=False)), use_container_width=True)
+                st.dataframe(add_average(df_home), use_container_width=True)
 
             with col2:
                 st.markdown(f"### {away_team}")
-                st.dataframe(add_average(df_away.sort_values(by="Rating", ascending=False)), use_container_width=True)
+                st.dataframe(add_average(df_away), use_container_width=True)
 
+show_profile()
@@ -1,6 +1,11 @@
 import streamlit as st
-import pandas as pd
-import os
+
+from utils.data import select_season, load_all_metrics
+from utils.players import load_player_dimension, load_player_ratings
+from utils.profiling import phase, rows, show_profile
+from utils.schema import parse_age
+from utils.snapshots import metrics_as_of, clean_matchdays
+from utils.warmup import start_warmup
 
 # ---------------- Stats ----------------
 def get_player_stats():
@@ -10,6 +15,7 @@ def get_goalkeeper_stats():
     return ["Line Index", "Passes Index"]
 
 st.set_page_config(page_title="Performance Metrics")
+start_warmup()
 st.title("Performance Metrics")
 st.markdown("""This page lets you explore **performance indices** across various leagues, positions, and metrics.
 
@@ -17,6 +23,7 @@ st.markdown("""This page lets you explore **performance indices** across various
 - The index values are shown on a **percentile scale** to allow fair comparisons across players.
 - The **indices are computed using a custom algorithm** that is regularly improved and updated based on new data.
 - These metrics aim to offer a consistent view of player performance, tailored to their role and playing time.
+- For the Big 5 + UCL + UEL + UECL group, **estimated indices** can also be shown **as of any matchday** of the season. They are recomputed from the match stats with a simpler formula, so they differ from the official indices, even after the last matchday.
 """)
 
 
@@ -24,15 +31,7 @@ st.markdown("""This page lets you explore **performance indices** across various
 # ---------------- Sidebar progressive filters ----------------
 st.sidebar.title("Select Parameters")
 
-selected_season = st.sidebar.selectbox("Season", ["2025-2026", "2024-2025", "2023-2024"], index=1)
-
-season = None
-if selected_season == "2023-2024":
-    season_code = "23_24"
-elif selected_season == "2024-2025":
-    season_code = "24_25"
-elif selected_season == "2025-2026":
-    season_code = "25_26"
+season_code = select_season()
 
 league_group = st.sidebar.multiselect("League Group", ["Big 5 + UCL + UEL + UECL", "Others Leagues"])
 if not league_group:
@@ -45,28 +44,28 @@ else:
     else:
         st.stop()
 
-base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "csv", f"csv{season_code}"))
-paths = {
-    "metrics_players": os.path.join(base_path, "metrics", f"{leagues_name}_metrics.csv"),
-    "metrics_gk": os.path.join(base_path, "metrics", f"{leagues_name}_metrics_gk.csv"),
-    "aggregated_players": os.path.join(base_path, "centiles", f"{leagues_name}_aggregated.csv"),
-    "aggregated_gk": os.path.join(base_path, "centiles", f"{leagues_name}_aggregated_gk.csv"),
-    "ratings_players": os.path.join(base_path, "ratings", "data_players.csv"),
-    "ratings_gk": os.path.join(base_path, "ratings", "data_goals.csv")
-}
-
-df_players = pd.read_csv(paths["metrics_players"])
-df_gk = pd.read_csv(paths["metrics_gk"])
-df_gk["Position"] = "GK"
-df_all = pd.concat([df_players, df_gk], ignore_index=True)
-
-if leagues_name == "TopLeagues":
-    df_notes = pd.concat([
-        pd.read_csv(paths["ratings_players"]),
-        pd.read_csv(paths["ratings_gk"])
-    ], ignore_index=True)
+phase("load")
+# The Top Leagues indices can also be estimated as of a matchday, from the match rows of clean/. The
+# estimate does not reproduce the official formula: it is a separate source, never mixed with the files.
+matchdays = clean_matchdays(season_code) if leagues_name == "TopLeagues" else []
+source = "Official"
+if matchdays:
+    source = st.sidebar.radio("Indices", ["Official", "Estimated as of a matchday"])
+if source == "Official":
+    try:
+        df_all = rows(load_all_metrics(season_code, leagues_name))
+    except FileNotFoundError:
+        # The season in progress has no official indices yet, only the estimated ones
+        st.info("No official indices for this season yet: choose the estimated indices.")
+        st.stop()
 else:
-    df_notes = pd.DataFrame(columns=["Player", "Rating", "Team", "League"])
+    as_of = st.sidebar.selectbox("Matchday", matchdays, index=len(matchdays) - 1)
+    st.caption(
+        f"Estimated indices as of {as_of}: averages of stat percentiles computed from the match stats. "
+        "They are not on the same basis as the official indices and should only be compared with each other. "
+        f"Average Rating, Team(s) and League(s) are also taken up to {as_of}."
+    )
+    df_all = rows(metrics_as_of(season_code, as_of))
 
 positions = st.sidebar.multiselect("Position", sorted(df_all["Position"].unique()))
 if not positions:
@@ -82,47 +81,33 @@ n = st.sidebar.slider("Number of top players to display", 5, 100, 30)
 min_minutes = st.sidebar.slider("Minimum minutes played", 0, 4000, 2000)
 age_max = st.sidebar.slider("Maximum age", 15, 50, 50)
 
+phase("filter")
 df_filtered = df_all[(df_all["Position"].isin(positions)) & (df_all[stat].notna())].copy()
 df_filtered = df_filtered[df_filtered["Minutes Played"] >= min_minutes]
-df_filtered["Age"] = df_filtered["Age"].astype(str).str.split("-").str[0].astype(int)
+df_filtered["Age"] = parse_age(df_filtered["Age"])
 df_filtered = df_filtered[df_filtered["Age"] <= age_max]
 
-df_grouped = df_filtered[["Player", stat, "Minutes Played", "Age", "Nation"]].copy()
-
-if not df_notes.empty:
-    df_rating = df_notes.groupby("Player", as_index=False)["Rating"].mean().rename(columns={"Rating": "Average Rating"})
-    df_rating["Average Rating"] = df_rating["Average Rating"].round(2)
+df_grouped = rows(df_filtered[["Player", stat, "Minutes Played", "Age", "Nation"]].copy())
 
-    df_club = df_notes.groupby("Player")["Team"].agg(lambda x: ", ".join(sorted(set(x)))).reset_index()
-    df_league = df_notes.groupby("Player")["League"].agg(lambda x: ", ".join(sorted(set(x)))).reset_index()
-
-    df_final = df_grouped.merge(df_rating, on="Player", how="left") \
-                         .merge(df_club, on="Player", how="left") \
-                         .merge(df_league, on="Player", how="left")
+phase("merge")
+if source == "Official":
+    # Rating, team(s) and league(s) come from the player dimension of the season
+    df_info = load_player_dimension(season_code, leagues_name)[["Average Rating", "Team(s)", "League(s)"]]
 else:
-    df_rating = pd.DataFrame(columns=["Player"])
-    df_aggregated_players = pd.read_csv(paths["aggregated_players"])
-    df_aggregated_gk = pd.read_csv(paths["aggregated_gk"])
-    df_aggregated_gk["Position"] = "GK"
-    df_aggregated_all = pd.concat([df_aggregated_players, df_aggregated_gk], ignore_index=True)
-    df_club = df_aggregated_all[["Player", "Team"]].drop_duplicates()
-
-    df_final = df_grouped.merge(df_rating, on="Player", how="left") \
-                         .merge(df_club, on="Player", how="left")
-
+    # Rating, team(s) and league(s) over the same matchdays as the estimated indices
+    df_info = load_player_ratings(season_code, tuple(matchdays[:matchdays.index(as_of) + 1]))
+df_final = df_grouped.join(df_info, on="Player")
+df_final["Average Rating"] = df_final["Average Rating"].round(2)
 df_final = df_final.sort_values(by=stat, ascending=False).head(n)
+rows(df_final)
 
-columns_to_display = ["Player", stat, "Age", "Nation", "Minutes Played"]
-if "Average Rating" in df_final.columns:
-    columns_to_display = ["Player", stat, "Average Rating", "Age", "Nation", "Minutes Played"]
-if "Team" in df_final.columns:
-    df_final.rename(columns={"Team": "Team(s)"}, inplace=True)
-    columns_to_display.append("Team(s)")
-if "League" in df_final.columns:
-    df_final.rename(columns={"League": "League(s)"}, inplace=True)
-    columns_to_display.append("League(s)")
+phase("render")
+if leagues_name == "TopLeagues":
+    columns_to_display = ["Player", stat, "Average Rating", "Age", "Nation", "Minutes Played", "Team(s)", "League(s)"]
+else:
+    columns_to_display = ["Player", stat, "Age", "Nation", "Minutes Played", "Team(s)"]
 
 df_display = df_final[columns_to_display]
-df_display["Nation"] = df_display["Nation"].astype(str).str.split(" ").str[1]
 st.dataframe(df_display.set_index("Player"), use_container_width=True)
 
+show_profile()
@@ -0,0 +1,92 @@
+import streamlit as st
+
+from utils.data import LEAGUE_GROUPS, load_all_centiles, load_all_metrics, load_all_ratings
+from utils.profiling import phase, rows, show_profile
+from utils.seasons import scan_seasons
+from utils.warmup import start_warmup
+
+# ------------------------- Functions -------------------------
+def get_features(position):
+    if position in ['FW', 'MO']:
+        return ['Goals', 'Expected Assists (xA)', 'Key Passes', 'Successful Take-Ons', 'Progressive Actions (Total)']
+    elif position == 'MF':
+        return ['Progressive Actions (Total)', 'Interceptions', 'Tackles Won', 'Ball Recoveries', 'Key Passes']
+    elif position == 'DF':
+        return ['Clearances', 'Interceptions', 'Aerial Duels Won', 'Progressive Passes', 'Ball Recoveries']
+    return ['Saves', 'Clean Sheets', 'Crosses Stopped', '% Saves', 'Sweeper Actions']
+
+def get_indices(position):
+    if position == 'GK':
+        return ['Line Index', 'Passes Index']
+    return ['Offensive Index', 'Passing Index', 'Possession Index', 'Defensive Index']
+
+def by_season(df, columns):
+    # One row per season; a player listed twice in a season (outfield and goalkeeper files) is averaged
+    return df.groupby("Season")[columns].mean().round(2)
+
+# ------------------------- Streamlit App -------------------------
+st.set_page_config(page_title="Player Trajectory")
+start_warmup()
+st.title("Player Trajectory")
+st.markdown("""This page follows one player **across every available season**.
+
+- Choose a **league group** and a **player**.
+- The **average match rating** (Big 5 + UCL + UEL + UECL only), **percentiles** and **performance indices** are shown season by season.
+- Only the seasons in which the player appears are displayed.
+""")
+
+st.sidebar.title("Select Parameters")
+
+league_group = st.sidebar.multiselect("League Group", list(LEAGUE_GROUPS))
+if not league_group:
+    st.stop()
+leagues_name = LEAGUE_GROUPS[league_group[0]]
+
+phase("load")
+# Only the Player and Position columns of each season are read to list the players
+df_players = rows(scan_seasons(load_all_centiles, leagues_name, "centiles", columns=("Player", "Position")))
+player = st.sidebar.selectbox("Player", sorted(df_players["Player"].dropna().unique()), index=None)
+if not player:
+    st.stop()
+
+phase("filter")
+df_player = df_players[df_players["Player"] == player]
+position = df_player["Position"].iloc[-1]
+features = st.sidebar.multiselect("Percentile stats", get_features(position), default=get_features(position))
+where = {"Player": [player]}
+
+phase("render")
+st.subheader(f"{player} ({position})")
+
+if leagues_name == "TopLeagues":
+    df_ratings = scan_seasons(load_all_ratings, columns=("Player", "Minutes", "Rating"), where=where)
+    if not df_ratings.empty:
+        df_rating = df_ratings.groupby("Season").agg(**{
+            "Average Rating": ("Rating", "mean"),
+            "Matches Played": ("Rating", "count"),
+            "Minutes Played": ("Minutes", "sum"),
+        }).round(2)
+        st.subheader("⭐ Average Rating")
+        st.line_chart(df_rating["Average Rating"])
+        st.dataframe(df_rating, use_container_width=True)
+
+if features:
+    df_centiles = scan_seasons(
+        load_all_centiles, leagues_name, "centiles", columns=("Player", *features), where=where
+    )
+    features = [col for col in features if col in df_centiles.columns]
+    st.subheader("📈 Percentiles")
+    df_percentiles = by_season(df_centiles, features)
+    st.line_chart(df_percentiles)
+    st.dataframe(df_percentiles, use_container_width=True)
+
+indices = get_indices(position)
+df_metrics = scan_seasons(load_all_metrics, leagues_name, "metrics", columns=("Player", *indices), where=where)
+indices = [col for col in indices if col in df_metrics.columns]
+if indices and not df_metrics.empty:
+    st.subheader("🧮 Performance Indices")
+    df_indices = by_season(df_metrics, indices)
+    st.line_chart(df_indices)
+    st.dataframe(df_indices, use_container_width=True)
+
+show_profile()
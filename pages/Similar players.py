@@ -0,0 +1,75 @@
+import streamlit as st
+import pandas as pd
+
+from utils.data import LEAGUE_GROUPS, select_season
+from utils.profiling import phase, rows, show_profile
+from utils.radar import radar_series, select_radar_mode, show_radar
+from utils.search import load_name_index, search_players
+from utils.similarity import load_similarity_index, similar_players
+from utils.warmup import start_warmup
+
+# ------------------------- Streamlit App -------------------------
+st.set_page_config(page_title="Similar Players")
+start_warmup()
+st.title("Similar Players")
+st.markdown("""Find the players whose **percentile profile** is closest to a given player's.
+
+- Choose a **season**, a **league group**, a **position** and a **player**.
+- Players are compared on the **radar stats of their position** (the same as in Individual Player Performances).
+- You can search among the players of the **other league group** (e.g. a replacement from the Others Leagues) and require a **minimum of minutes played**.
+- A **similarity** of 100 means identical percentiles.
+""")
+
+st.sidebar.title("Select Parameters")
+
+season_code = select_season()
+
+league_group = st.sidebar.selectbox("League Group", list(LEAGUE_GROUPS), index=None)
+if not league_group:
+    st.stop()
+leagues_name = LEAGUE_GROUPS[league_group]
+
+position = st.sidebar.selectbox("Position", ["GK", "DF", "MF", "MO", "FW"], index=None)
+if not position:
+    st.stop()
+
+phase("load")
+df_players, _, _ = load_similarity_index(season_code, leagues_name, position)
+name_index = load_name_index(season_code, leagues_name, goalkeepers=position == "GK")
+query = st.sidebar.text_input("Search players", placeholder="Player or team name")
+current = st.session_state.get("similar_player")
+options = list(dict.fromkeys(([current] if current in df_players.index else []) + search_players(name_index, query, [position])))
+player = st.sidebar.selectbox("Player", options, index=None, key="similar_player")
+if not player:
+    st.stop()
+
+search_group = st.sidebar.selectbox("Search in", list(LEAGUE_GROUPS), index=list(LEAGUE_GROUPS).index(league_group))
+n = st.sidebar.slider("Number of similar players", 5, 50, 10)
+min_minutes = st.sidebar.slider("Minimum minutes played", 0, 4000, 900)
+
+phase("filter")
+df_similar = rows(similar_players(
+    season_code, leagues_name, position, player, n,
+    search_group=LEAGUE_GROUPS[search_group], min_minutes=min_minutes
+))
+
+phase("render")
+features = list(df_players.columns.drop(["Team", "Age", "Minutes Played"]))
+
+st.subheader(f"🎯 {player} ({df_players.loc[player, 'Team']})")
+st.dataframe(df_players.loc[[player], ["Age", "Minutes Played"] + features], use_container_width=True)
+
+if df_similar.empty:
+    st.info("No player matches these filters.")
+    st.stop()
+
+st.subheader("🔍 Most Similar Players")
+st.dataframe(df_similar, use_container_width=True)
+
+st.subheader("📌 Radar Comparison")
+closest = st.multiselect("Compare with", list(df_similar.index), default=list(df_similar.index[:2]))
+df_radar = pd.concat([df_players.loc[[player], features], df_similar.loc[closest, features]])
+series, _ = radar_series(df_radar.rename_axis("Player").reset_index(), "Player", [player] + closest, features)
+show_radar(features, series, select_radar_mode())
+
+show_profile()
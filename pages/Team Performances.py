@@ -1,8 +1,13 @@
 import streamlit as st
 import pandas as pd
-import numpy as np
-import matplotlib.pyplot as plt
-import os
+
+from utils.data import select_season, load_teams, load_all_ratings
+from utils.percentiles import peer_percentiles
+from utils.profiling import phase, show_profile, step
+from utils.radar import radar_series, select_radar_mode, show_radar
+from utils.snapshots import clean_matchdays
+from utils.teams import VENUES, team_window
+from utils.warmup import start_warmup
 
 # ------------------------- Functions -------------------------
 def get_features():
@@ -11,69 +16,85 @@ def get_features():
         'Aerial Duels Won', 'Possession', 'Clean Sheets', 'Goals Against', 'Efficiency GK'
     ]
 
-def load_centile_data(leagues_name, path_folder):
-    path = os.path.join(path_folder, f"teams/{leagues_name}_centiles.csv")
-    return pd.read_csv(path)
+def load_centile_data(leagues_name, season_code):
+    return load_teams(season_code, leagues_name, "centiles")
+
+def load_adjusted_data(leagues_name, season_code):
+    return load_teams(season_code, leagues_name, "adjusted")
+
+def load_aggregated_data(leagues_name, season_code):
+    return load_teams(season_code, leagues_name, "aggregated")
 
-def load_adjusted_data(leagues_name, path_folder):
-    path = os.path.join(path_folder, f"teams/{leagues_name}_adjusted.csv")
-    return pd.read_csv(path)
+def apply_team_peer_group(df_centiles, df_adjusted, leagues_name, season_code, selected_teams):
+    st.sidebar.markdown("---")
+    if not st.sidebar.checkbox("Custom peer group", value=False):
+        return df_centiles
 
-def load_aggregated_data(leagues_name, path_folder):
-    path = os.path.join(path_folder, f"teams/{leagues_name}_aggregated.csv")
-    return pd.read_csv(path)
+    peer_teams = None
+    if leagues_name == "TopLeagues":
+        df_leagues = load_all_ratings(season_code, columns=("Team", "League"))
+        peer_league = st.sidebar.selectbox("Peer league", ["All leagues"] + sorted(df_leagues["League"].dropna().unique()))
+        if peer_league != "All leagues":
+            peer_teams = df_leagues.loc[df_leagues["League"] == peer_league, "Team"].unique()
+    min_matches = st.sidebar.slider("Peer minimum matches", 1, 60, 1)
 
-def plot_team_radar(df, features, selected_teams):
-    angles = np.linspace(0, 2 * np.pi, len(features), endpoint=False).tolist()
-    angles += angles[:1]
-    fig, ax = plt.subplots(figsize=(6, 6), subplot_kw={"projection": "polar"})
+    mask = df_adjusted["Matches Played"] >= min_matches
+    if peer_teams is not None:
+        mask &= df_adjusted["Team"].isin(peer_teams)
+    st.sidebar.caption(f"{int(mask.sum())} teams in the peer group")
 
-    for team in selected_teams:
-        values = df.loc[df["Team"] == team, features].values.flatten().tolist()
-        values += values[:1]
-        ax.plot(angles, values, label=team, linewidth=2)
-        ax.fill(angles, values, alpha=0.1)
+    stats = [col for col in df_centiles.columns if col in df_adjusted.columns and col not in ['Team', 'Average Age', 'Matches Played']]
+    df_targets = df_adjusted[df_adjusted["Team"].isin(selected_teams)].drop_duplicates("Team").set_index("Team")
+    df_peer = peer_percentiles(df_adjusted[mask], df_targets, stats)
 
-    ax.set_xticks(angles[:-1])
-    ax.set_xticklabels(features, fontsize=10)
-    ax.set_yticklabels([])
-    ax.legend(loc="upper right", bbox_to_anchor=(1.3, 1.1))
-    st.pyplot(fig)
+    df_centiles = df_centiles.copy()
+    in_peer = df_centiles["Team"].isin(df_peer.index)
+    df_centiles.loc[in_peer, stats] = df_peer.loc[df_centiles.loc[in_peer, "Team"], stats].to_numpy()
+    return df_centiles
+
+def plot_team_radar(df, features, selected_teams, mode):
+    series, _ = radar_series(df, "Team", selected_teams, features)
+    show_radar(features, series, mode)
 
 # ------------------------- Streamlit App -------------------------
 st.set_page_config(page_title="Team Performances")
+start_warmup()
 st.title("Team Performances")
 st.markdown("""This page allows you to explore **team-level performances** from various leagues.  
 
 - Select one or more teams from the **Big 5 Leagues, UCL, UEL, or UECL** to view detailed stats, including a **percentile radar chart**.  
+- For the Big 5 Leagues and European cups, stats can be computed over a **range of matchdays** or over **home or away matches** only.
 - You can also view team stats from **Other Leagues** such as the Argentine Primera, Brazilian Série A, Dutch Eredivisie, MLS, Portuguese Primeira Liga, Copa Libertadores, English Championship, Italian Serie B, Liga MX, and Belgian Pro League.
 """)
 
 st.sidebar.title("Select Parameters")
-selected_season = st.sidebar.selectbox("Season", ["2025-2026", "2024-2025", "2023-2024"], index=1)
-
-season = None
-if selected_season == "2023-2024":
-    season_code = "23_24"
-elif selected_season == "2024-2025":
-    season_code = "24_25"
-elif selected_season == "2025-2026":
-    season_code = "25_26"
-    
-path_folder = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "csv", f"csv{season_code}"))
+season_code = select_season()
 
 selected_leagues = st.sidebar.multiselect("League Group", ["Big 5 + UCL + UEL + UECL", "Others Leagues"])
 leagues_name = "TopLeagues" if "Big 5 + UCL + UEL + UECL" in selected_leagues else "OthersLeagues" if "Others Leagues" in selected_leagues else None
 
 if leagues_name:
+    phase("load")
+    # Top Leagues teams can also be compared over a window of matchdays, or over their home or away
+    # matches only, from the match rows of clean/
+    matchdays = clean_matchdays(season_code) if leagues_name == "TopLeagues" else []
+    whole_season = True
+    if matchdays:
+        first, last = st.sidebar.select_slider("Matchdays", matchdays, value=(matchdays[0], matchdays[-1]))
+        venue = st.sidebar.radio("Matches", VENUES, horizontal=True)
+        whole_season = (first, last, venue) == (matchdays[0], matchdays[-1], "All")
     try:
-        df_centiles = load_centile_data(leagues_name, path_folder)
-        df_adjusted = load_adjusted_data(leagues_name, path_folder)
-        df_agg = load_aggregated_data(leagues_name, path_folder)
+        if whole_season:
+            df_centiles = load_centile_data(leagues_name, season_code)
+            df_adjusted = load_adjusted_data(leagues_name, season_code)
+            df_agg = load_aggregated_data(leagues_name, season_code)
+        else:
+            df_agg, df_adjusted, df_centiles = team_window(season_code, first, last, venue)
     except Exception as e:
         st.error(f"Error loading data: {e}")
         st.stop()
 
+    phase("filter")
     df_centiles = df_centiles[df_centiles['Matches Played'] > 0].copy()
     df_adjusted = df_adjusted[df_adjusted['Matches Played'] > 0].copy()
     df_agg = df_agg[df_agg['Matches Played'] > 0].copy()
@@ -81,21 +102,29 @@ if leagues_name:
     teams = df_centiles['Team'].unique().tolist()
     selected_teams = st.sidebar.multiselect("Select Teams", teams)
 
-    selected_features = get_features()
+    # Windows only have the stats of the clean/ match rows
+    selected_features = [feature for feature in get_features() if feature in df_centiles.columns]
 
     if selected_teams:
+        phase("merge")
+        df_centiles = apply_team_peer_group(df_centiles, df_adjusted, leagues_name, season_code, selected_teams)
+
+        phase("render")
         st.subheader("📋 Global Team Stats")
         basic_cols = ['Team', 'Average Age', 'Matches Played', 'Goals', 'Goals Against', 'Clean Sheets', 'Yellow Cards', 'Red Cards']
         df_global = df_agg[df_agg['Team'].isin(selected_teams)].copy()
+        basic_cols = [col for col in basic_cols if col in df_global.columns]
         st.dataframe(df_global[basic_cols].set_index("Team").round(2), use_container_width=True)
 
         if selected_features:
             st.subheader("📌 Radar Chart")
-            plot_team_radar(df_centiles, selected_features, selected_teams)
+            radar_mode = select_radar_mode()
+            with step("radar chart"):
+                plot_team_radar(df_centiles, selected_features, selected_teams, radar_mode)
 
             st.subheader("📈 Percentiles of Radar Stats")
             df_radar_percentiles = df_centiles[df_centiles['Team'].isin(selected_teams)][["Team"] + selected_features]
-            st.dataframe(df_radar_percentiles.set_index("Team").T)
+            st.dataframe(df_radar_percentiles.astype({"Team": str}).set_index("Team").T)
 
         st.subheader("🧮 Adjusted Stats + Percentiles")
         for team in selected_teams:
@@ -114,3 +143,5 @@ if leagues_name:
 
             st.markdown(f"### 🔎 {team}")
             st.dataframe(df_combined.sort_index(), use_container_width=True)
+
+show_profile()
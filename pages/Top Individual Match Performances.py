@@ -1,6 +1,10 @@
 import streamlit as st
-import pandas as pd
-import os
+
+from utils.data import select_season
+from utils.facts import load_match_facts
+from utils.leaderboards import match_stat_order, top_rows
+from utils.profiling import phase, rows, show_profile
+from utils.warmup import start_warmup
 
 # ------------------------- Functions -------------------------
 def get_player_stats():
@@ -36,26 +40,9 @@ def get_goalkeeper_stats():
         "Sweeper Actions", "Defensive Actions Outside Penalty Area",
     ]
 
-def get_opponent_score(row):
-    league = row["League"]
-    gameweek = row["Game Week"]
-    team = row["Team"]
-    match_df = games.get(league)
-    
-    if match_df is None:
-        return pd.Series(["Unknown", "N/A"])
-
-    match = match_df[match_df["Game Week"] == gameweek]
-    for _, m in match.iterrows():
-        if m["Home Team"] == team:
-            return pd.Series([m["Away Team"], m["Score"]])
-        elif m["Away Team"] == team:
-            return pd.Series([m["Home Team"], m["Score"]])
-    
-    return pd.Series(["Unknown", "N/A"])
-
 # ------------------------- Streamlit App -------------------------
 st.set_page_config(page_title="Top Individual Match Performances")
+start_warmup()
 st.title("Top Individual Match Performances")
 st.markdown("""Explore the **top Individual Match Performances** across all leagues and positions.
 
@@ -67,56 +54,21 @@ st.markdown("""Explore the **top Individual Match Performances** across all leag
 
 st.sidebar.title("Select Parameters")
 
-selected_season = st.sidebar.selectbox("Season", ["2025-2026", "2024-2025", "2023-2024"], index=1)
-
-season = None
-if selected_season == "2023-2024":
-    season_code = "23_24"
-elif selected_season == "2024-2025":
-    season_code = "24_25"
-elif selected_season == "2025-2026":
-    season_code = "25_26"
-
-path_folder = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "csv", f"csv{season_code}"))
-
-paths = {
-    "games": os.path.join(path_folder, "leagues_games", "{}_games.csv"),
-    "clean_players": os.path.join(path_folder, "clean", "data_players.csv"),
-    "clean_goals": os.path.join(path_folder, "clean", "data_goals.csv"),
-    "ratings_players": os.path.join(path_folder, "ratings", "data_players.csv"),
-    "ratings_goals": os.path.join(path_folder, "ratings", "data_goals.csv"),
-}
-
-df_players = pd.read_csv(paths["clean_players"])
-df_goalkeepers = pd.read_csv(paths["clean_goals"])
-df_ratings_players = pd.read_csv(paths["ratings_players"])
-df_ratings_goalkeepers = pd.read_csv(paths["ratings_goals"])
-
-df_goalkeepers["Position"] = "GK"
-df_all = pd.concat([df_players, df_goalkeepers], ignore_index=True)
-df_ratings = pd.concat([df_ratings_players, df_ratings_goalkeepers], ignore_index=True)
-
-df = df_all.merge(
-    df_ratings,
-    on=["Player", "Game Week", "Team", "League", "Minutes", "Position"],
-    how="left"
-)
-nationality_map = df_all[["Player", "Nationality"]].drop_duplicates(subset="Player").set_index("Player")["Nationality"]
-df["Nation"] = df["Player"].map(nationality_map)
+season_code = select_season()
 
+phase("load")
+df = rows(load_match_facts(season_code))
 
-positions = st.sidebar.multiselect("Position", df_all["Position"].unique())
+positions = st.sidebar.multiselect("Position", df["Position"].unique())
 if not positions:
     st.stop()
 
 if set(positions) == {"GK"}:
     stats_list = get_goalkeeper_stats()
-    df = df[df["Position"] == "GK"]
 else:
     stats_list = get_player_stats()
-    df = df[df["Position"].isin(positions)]
-    
-leagues = sorted(df["League"].dropna().unique())
+
+leagues = sorted(df.loc[df["Position"].isin(positions), "League"].dropna().unique())
 all_leagues = st.sidebar.checkbox("All leagues", value=True)
 selected_leagues = leagues if all_leagues else [st.sidebar.selectbox("Choose a league", leagues)]
 
@@ -124,29 +76,15 @@ stat = st.sidebar.selectbox("Statistic to display", sorted(stats_list))
 top_n = st.sidebar.slider("Number of top performances to display", 5, 100, 30)
 age_max = st.sidebar.slider("Maximum age", 15, 50, 50)
 
-df = df[df["League"].isin(selected_leagues)]
-if stat and stat in df.columns:
-    df = df[df[stat].notna()]
-
-games = {}
-for lg in df["League"].unique():
-    try:
-        games[lg] = pd.read_csv(paths["games"].format(lg))
-    except FileNotFoundError:
-        continue
-
-if positions and stat and selected_leagues:
-    df[["Opponent", "Score"]] = df.apply(get_opponent_score, axis=1)
-
-    df = df[df[stat].notna() & df["Score"].notna()]
-    
-    df_top = df.copy()
-    
-    df_top["Age"] = df_top["Age"].astype(str).str.split("-").str[0].astype(int)
-    df_top = df_top[df_top["Age"] <= age_max]
-    
-    df_top = df_top.sort_values(by=stat, ascending=False).head(top_n)
+if positions and stat in df.columns and selected_leagues:
+    phase("filter")
+    # Rows are read best first from the presorted order of the stat until top_n of them pass the filters
+    df_top = top_rows(
+        df, match_stat_order(season_code, stat), top_n,
+        positions=positions, leagues=selected_leagues, age_max=age_max, required=("Score",)
+    )
     
+    phase("render")
     df_display = df_top[[
         "Player", stat, "Rating", "Age", "Nation", "Minutes", "Score", "Team", "Opponent",
         "League", "Game Week"
@@ -156,7 +94,7 @@ if positions and stat and selected_leagues:
         "Game Week": "Game Week",
         "Minutes": "Minutes Played"
     })
-
-    df_display["Nation"] = df_display["Nation"].astype(str).str.split(" ").str[1]
     
-    st.dataframe(df_display.set_index("Player"), use_container_width=True)
\ No newline at end of file
+    st.dataframe(df_display.set_index("Player"), use_container_width=True)
+
+show_profile()
@@ -1,6 +1,11 @@
 import streamlit as st
-import pandas as pd
-import os
+
+from utils.data import select_season, load_all_centiles
+from utils.leaderboards import season_stat_order, top_rows
+from utils.players import load_player_dimension
+from utils.profiling import phase, rows, show_profile
+from utils.schema import parse_age
+from utils.warmup import start_warmup
 
 # ----------------------- Stats ------------------------
 def get_player_stats():
@@ -47,6 +52,7 @@ def get_goalkeeper_stats():
 # ----------------------- Streamlit UI ------------------------
 
 st.set_page_config(page_title="Top Individual Season Performances")
+start_warmup()
 st.title("Top Individual Season Performances")
 st.markdown("""Explore the **top Individual Season Performances** across all leagues and positions.
 
@@ -61,15 +67,7 @@ st.markdown("""Explore the **top Individual Season Performances** across all lea
 
 st.sidebar.title("Select Parameters")
 
-selected_season = st.sidebar.selectbox("Season", ["2025-2026", "2024-2025", "2023-2024"], index=1)
-
-season = None
-if selected_season == "2023-2024":
-    season_code = "23_24"
-elif selected_season == "2024-2025":
-    season_code = "24_25"
-elif selected_season == "2025-2026":
-    season_code = "25_26"
+season_code = select_season()
 
 league_group = st.sidebar.multiselect("League Group", ["Big 5 + UCL + UEL + UECL", "Others Leagues"])
 if not league_group:
@@ -82,42 +80,18 @@ else:
     else:
         st.stop()
 
-base_path = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "csv", f"csv{season_code}"))
-paths = {
-    "adjusted_players": os.path.join(base_path, "centiles", f"{leagues_name}_adjusted.csv"),
-    "adjusted_gk": os.path.join(base_path, "centiles", f"{leagues_name}_adjusted_gk.csv"),
-    "aggregated_players": os.path.join(base_path, "centiles", f"{leagues_name}_aggregated.csv"),
-    "aggregated_gk": os.path.join(base_path, "centiles", f"{leagues_name}_aggregated_gk.csv"),
-    "ratings_players": os.path.join(base_path, "ratings", "data_players.csv"),
-    "ratings_gk": os.path.join(base_path, "ratings", "data_goals.csv")
-}
-
 per_90 = st.sidebar.checkbox("Per 90 min?", value=True)
 
 # ----------------------- Load Data ------------------------
 
-if per_90:
-    df_players = pd.read_csv(paths["adjusted_players"])
-    df_gk = pd.read_csv(paths["adjusted_gk"])
-else:
-    df_players = pd.read_csv(paths["aggregated_players"])
-    df_gk = pd.read_csv(paths["aggregated_gk"])
-
-df_gk["Position"] = "GK"
-df_all = pd.concat([df_players, df_gk], ignore_index=True)
-
-
-if leagues_name == "TopLeagues":
-    df_notes = pd.concat([
-        pd.read_csv(paths["ratings_players"]),
-        pd.read_csv(paths["ratings_gk"])
-    ], ignore_index=True)
-else:
-    df_notes = pd.DataFrame(columns=["Player", "Rating", "Squad"])
+kind = "adjusted" if per_90 else "aggregated"
+id_columns = ("Player", "Position", "Age", "Minutes Played")
 
 # ----------------------- Filters ------------------------
 
-positions = st.sidebar.multiselect("Position", sorted(df_all["Position"].unique()))
+phase("load")
+df_positions = load_all_centiles(season_code, leagues_name, kind, columns=("Position",))
+positions = st.sidebar.multiselect("Position", sorted(df_positions["Position"].unique()))
 if not positions:
     st.stop()
 
@@ -128,59 +102,31 @@ n = st.sidebar.slider("Number of top players to display", 5, 100, 30)
 min_minutes = st.sidebar.slider("Minimum minutes played", 0, 4000, 2000)
 age_max = st.sidebar.slider("Maximum age", 15, 50, 50)  
 
-df_filtered = df_all[(df_all["Position"].isin(positions)) & (df_all[stat].notna())].copy()
-df_top = df_filtered.copy()
-df_top["Age"] = df_top["Age"].astype(str).str.split("-").str[0].astype(int)
-df_top = df_top[df_top["Age"] <= age_max]
-
-df_top = df_top[df_top["Minutes Played"] >= min_minutes]
-df_grouped = df_top.groupby("Player", as_index=False).agg({stat: "sum", "Minutes Played": "sum", "Age": "first"})
+# Only the identity columns and the selected stat are read from the wide centiles files
+df_all = rows(load_all_centiles(season_code, leagues_name, kind, columns=id_columns + (stat,)))
+
+phase("filter")
+# Players are read best first from the presorted order of the stat until n of them pass the filters
+df_top = top_rows(
+    df_all, season_stat_order(season_code, leagues_name, kind, stat), n,
+    positions=positions, age_max=age_max, min_minutes=min_minutes
+)
+df_grouped = df_top[["Player", stat, "Minutes Played"]].copy()
+df_grouped["Age"] = parse_age(df_top["Age"])
 df_grouped[stat] = round(df_grouped[stat], 2)
-#else:
-#    df_top["RawStat"] = df_top[stat]
-#    df_grouped = df_top.groupby("Player", as_index=False).agg({
-#        "RawStat": "sum", "Minutes Played": "sum", "Age": "first"
-#    })
-#    df_grouped[stat] = round((df_grouped["RawStat"], 2)
-#    df_grouped.drop(columns=["RawStat"], inplace=True)
-
-df_grouped = df_grouped[df_grouped["Minutes Played"] >= min_minutes]
 
 # ----------------------- Join Data ------------------------
 
-if not df_notes.empty:
-    df_rating = df_notes.groupby("Player", as_index=False)["Rating"].mean().rename(columns={"Rating": "Average Rating"})
-    df_rating["Average Rating"] = df_rating["Average Rating"].round(2)
-    df_club = df_notes.groupby("Player")["Team"].agg(lambda x: ", ".join(sorted(set(x)))).reset_index()
-    df_league = df_notes.groupby("Player")["League"].agg(lambda x: ", ".join(sorted(set(x)))).reset_index()
-    df_total = df_grouped.merge(df_rating, on="Player", how="left") \
-                            .merge(df_club, on="Player", how="left") \
-                            .merge(df_all, on="Player", how="left") \
-                            .merge(df_league, on="Player", how="left")
-else:
-    df_rating = pd.DataFrame(columns=["Player", "Average Rating"])
-    df_aggregated_players = pd.read_csv(paths["aggregated_players"])
-    df_aggregated_gk = pd.read_csv(paths["aggregated_gk"])
-    df_aggregated_gk["Position"] = "GK"
-    df_aggregated_all = pd.concat([df_aggregated_players, df_aggregated_gk], ignore_index=True)
-    df_club = df_aggregated_all[["Player", "Team"]].drop_duplicates()
-    df_total = df_grouped.merge(df_rating, on="Player", how="left") \
-                            .merge(df_club, on="Player", how="left") \
-                            .merge(df_all, on="Player", how="left")
-                        
-cols_x = [col for col in df_total.columns if col.endswith('_x')]
-rename_dict = {col: col.replace('_x', '') for col in cols_x}
-df_total = df_total.rename(columns=rename_dict)
-df_total = df_total.drop(columns=[col for col in df_total.columns if '_y' in col or '_x' in col], errors='ignore')
+phase("merge")
+# Nation, rating, team(s) and league(s) come from the player dimension of the season
+df_info = load_player_dimension(season_code, leagues_name)[["Nation", "Average Rating", "Team(s)", "League(s)"]]
+df_total = df_grouped.join(df_info, on="Player")
+df_total["Average Rating"] = df_total["Average Rating"].round(2)
 df_total = df_total.sort_values(by=stat, ascending=False).head(n)
+rows(df_total)
 
 # ----------------------- Display ------------------------
-df_total = df_total.rename(columns={
-    "Team": "Team(s)",
-    "Minutes": "Minutes Played",
-    "League": "League(s)"
-})
-
+phase("render")
 if leagues_name == "TopLeagues":
     selected_columns = ["Player", stat, "Average Rating", "Age", "Nation", "Minutes Played", "Team(s)", "League(s)"]
 else:
@@ -190,8 +136,7 @@ df_display = df_total[selected_columns].drop_duplicates()
 
 if ["GK"] in positions:
      df_display["Minutes Played"] = df_display["Minutes Played"].astype(int)
-     
-df_display["Nation"] = df_display["Nation"].astype(str).str.split(" ").str[1]
 
 st.dataframe(df_display.set_index("Player"), use_container_width=True)
 
+show_profile()
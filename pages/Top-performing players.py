@@ -1,153 +1,108 @@
 import streamlit as st
-import pandas as pd
-import os
-import re
 
-# ------------------------- Functions -------------------------
-def extract_matchday_num(j):
-    match = re.match(r"J(\d+)", str(j))
-    return int(match.group(1)) if match else -1
-
-def new_poste(df_all):
-    main_positions = (
-        df_all.groupby("Player")["Position"]
-        .agg(lambda x: x.mode().iloc[0])
-        .reset_index()
-        .rename(columns={"Position": "Main Position"})
-    )
-    df_all = df_all.merge(main_positions, on="Player", how="left")
-    df_all["Position"] = df_all["Main Position"]
-    df_all.drop(columns=["Main Position"], inplace=True)
-    return df_all
-
-def enrich_with_team_league_age(df_ratings, df_all, df_centiles, leagues, all_leagues):
-    if all_leagues or len(leagues) > 1:
-        clubs = df_all.groupby("Player")["Team"].apply(lambda x: ", ".join(sorted(set(x)))).reset_index()
-        leagues_info = df_all.groupby("Player")["League"].apply(lambda x: ", ".join(sorted(set(x)))).reset_index()
-    else:
-        filtered = df_all[df_all["League"] == leagues[0]]
-        clubs = filtered.groupby("Player")["Team"].apply(lambda x: ", ".join(sorted(set(x)))).reset_index()
-        leagues_info = filtered.groupby("Player")["League"].apply(lambda x: ", ".join(sorted(set(x)))).reset_index()
-
-    age_df = df_centiles[["Player", "Age"]].drop_duplicates()
-    age_df["Age"] = age_df["Age"].astype(str).str.split("-").str[0].astype(int)
+from utils.aggregates import load_matchday_sums, load_rating_aggregates, matchday_range_aggregates
+from utils.data import select_season
+from utils.players import load_player_dimension, load_league_teams
+from utils.profiling import phase, rows, show_profile
+from utils.warmup import start_warmup
 
-    return (
-        df_ratings.merge(clubs, on="Player", how="left")
-                  .merge(leagues_info, on="Player", how="left")
-                  .merge(age_df, on="Player", how="left")
-    )
+# ------------------------- Functions -------------------------
+def summed_ratings(df_agg, leagues, positions):
+    # The aggregates of the selected leagues and positions are added up per player
+    df_sel = df_agg[df_agg["League"].isin(leagues) & df_agg["Position"].isin(positions)]
+    df_sum = df_sel.groupby(["Player", "Position"], as_index=False, observed=True)[
+        ["Rating Sum", "Rated Matches", "Minutes Played", "Matches Played"]
+    ].sum()
+    # float32, like the mean of the match ratings
+    df_sum["Average Rating"] = (df_sum["Rating Sum"] / df_sum["Rated Matches"]).astype("float32")
+    return df_sum[["Player", "Position", "Average Rating", "Minutes Played", "Matches Played"]]
+
+def enrich_with_team_league_age(df_ratings, season_code, leagues, all_leagues):
+    df_info = load_player_dimension(season_code)[["Team(s)", "League(s)", "Age", "Nation"]]
+    if not (all_leagues or len(leagues) > 1):
+        df_info = df_info.assign(**{
+            "Team(s)": load_league_teams(season_code).xs(leagues[0], level="League"),
+            "League(s)": leagues[0],
+        })
+    return df_ratings.join(df_info, on="Player")
 
 # ------------------------- Streamlit App -------------------------
 st.set_page_config(page_title="Top-Performing Players")
+start_warmup()
 st.sidebar.title("Select Parameters")
 
-selected_season = st.sidebar.selectbox("Season", ["2025-2026", "2024-2025", "2023-2024"], index=1)
-
-season = None
-if selected_season == "2023-2024":
-    season_code = "23_24"
-elif selected_season == "2024-2025":
-    season_code = "24_25"
-elif selected_season == "2025-2026":
-    season_code = "25_26"
+season_code = select_season()
 
-path_folder = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "csv", f"csv{season_code}"))
+phase("load")
+# Sums per (League, Position, Player) over all matchdays, built at ingest
+df_agg = rows(load_rating_aggregates(season_code))
 
-ratings_players_path = os.path.join(path_folder, "ratings", "data_players.csv")
-ratings_goalkeepers_path = os.path.join(path_folder, "ratings", "data_goals.csv")
-agg_players_path = os.path.join(path_folder, "centiles", "TopLeagues_aggregated.csv")
-agg_goalkeepers_path = os.path.join(path_folder, "centiles", "TopLeagues_aggregated_gk.csv")
-
-df_players = pd.read_csv(ratings_players_path)
-df_goalkeepers = pd.read_csv(ratings_goalkeepers_path)
-df_all = pd.concat([df_players, df_goalkeepers], ignore_index=True)
-df_all.dropna(subset=["Rating"], inplace=True)
-
-df_centiles_players = pd.read_csv(agg_players_path)
-df_centiles_gk = pd.read_csv(agg_goalkeepers_path)
-df_centiles_gk["Position"] = "GK"
-df_centiles = pd.concat([df_centiles_players, df_centiles_gk], ignore_index=True)
-df_centiles["Nation"] = df_centiles["Nation"].astype(str).str.split(" ").str[1]
-
-positions = sorted(df_all["Position"].unique())
+positions = sorted(df_agg["Position"].unique())
 all_positions = st.sidebar.checkbox("All positions", value=True)
 selected_positions = positions if all_positions else [st.sidebar.selectbox("Choose a position", positions)]
 
-leagues = sorted(df_all["League"].unique())
+leagues = sorted(df_agg["League"].unique())
 all_leagues = st.sidebar.checkbox("All leagues", value=True)
 selected_leagues = leagues if all_leagues else [st.sidebar.selectbox("Choose a league", leagues)]
 
-matchdays = sorted(df_all["Game Week"].dropna().unique(), key=extract_matchday_num)
 all_matchdays = st.sidebar.checkbox("All matchdays", value=True)
-selected_matchdays = matchdays if all_matchdays else [st.sidebar.selectbox("Choose a matchday", matchdays)]
+if not all_matchdays:
+    # Any range of matchdays, served from the cumulative sums of the season
+    _, matchdays, _ = load_matchday_sums(season_code)
+    if not matchdays:
+        st.info("No matchday has been rated yet this season.")
+        st.stop()
+    matchday_mode = st.sidebar.radio("Matchdays", ["Range", "Last matchdays"], horizontal=True)
+    if matchday_mode == "Range":
+        first_matchday, last_matchday = st.sidebar.select_slider(
+            "Choose matchdays", matchdays, value=(matchdays[0], matchdays[-1])
+        )
+    else:
+        # A slider needs two values: early in the season, the only matchday is the last one
+        n_last = 1
+        if len(matchdays) > 1:
+            n_last = st.sidebar.slider("Number of last matchdays", 1, len(matchdays), min(5, len(matchdays)))
+        first_matchday, last_matchday = matchdays[-n_last], matchdays[-1]
+    n_matchdays = matchdays.index(last_matchday) - matchdays.index(first_matchday) + 1
 
 top_n = st.sidebar.slider("Number of players to display", 5, 100, 30)
-min_matches = st.sidebar.slider("Minimum matches played", 1, 50, 25)
+min_matches = st.sidebar.slider("Minimum matches played", 1, 50, 25 if all_matchdays else min(25, n_matchdays))
 age_max = st.sidebar.slider("Maximum age", 15, 50, 50)
 
-df_all = new_poste(df_all)
-
-df_filtered = df_all[
-    (df_all["League"].isin(selected_leagues)) &
-    (df_all["Game Week"].isin(selected_matchdays)) &
-    (df_all["Position"].isin(selected_positions))
-]
+phase("filter")
+if not all_matchdays:
+    df_agg = matchday_range_aggregates(season_code, first_matchday, last_matchday)
+df_avg = summed_ratings(df_agg, selected_leagues, selected_positions)
+rows(df_avg)
 
-df_avg = df_filtered.groupby(["Player", "Position"], as_index=False)["Rating"].mean().rename(columns={"Rating": "Average Rating"})
-
-df_avg = enrich_with_team_league_age(df_avg, df_all, df_centiles, selected_leagues, all_leagues)
-
-df_minutes_total = (
-    df_filtered
-    .groupby("Player", as_index=False)
-    .agg(
-        **{
-            "Minutes Played": ("Minutes", "sum"),
-            "Matches Played": ("Minutes", "count")
-        }
-    )
-)
-df_avg = df_avg.merge(
-    df_minutes_total.drop_duplicates(subset="Player"),
-    on="Player",
-    how="left"
-)
-
-df_avg = df_avg.merge(
-    df_centiles.drop_duplicates(subset="Player"),
-    on="Player",
-    how="left"
-)
-
-cols_x = [col for col in df_avg.columns if col.endswith('_x')]
-rename_dict = {col: col.replace('_x', '') for col in cols_x}
-df_avg = df_avg.rename(columns=rename_dict)
-df_avg = df_avg.drop(columns=[col for col in df_avg.columns if '_y' in col or '_x' in col], errors='ignore')
+phase("merge")
+df_avg = enrich_with_team_league_age(df_avg, season_code, selected_leagues, all_leagues)
 
 df_avg = df_avg[(df_avg["Matches Played"] >= min_matches) & (df_avg["Age"] <= age_max)]
 df_avg["Average Rating"] = df_avg["Average Rating"].round(2)
 
 df_top = df_avg.sort_values(by="Average Rating", ascending=False).head(top_n)
 df_top.set_index("Player", inplace=True)
+rows(df_avg)
 
+phase("render")
 st.title("Top-Performing Players")
 st.markdown("""
 This page displays the **top-performing players** based on their average match ratings.
 
-- You can filter by **league**, **position**, **matchday**, and **age**.
+- You can filter by **league**, **position**, **matchday range** (or the last matchdays), and **age**.
 - Only players with a minimum number of matches are shown.
 - Ratings come from a custom algorithm and are subjective.
 """)
 
 if all_leagues or len(selected_leagues) > 1:
-    cols_to_display = ["Average Rating", "Age", "Nation", "Matches Played", "Minutes Played", "Team", "League"]
-    rename_cols = {"Team": "Team(s)", "League": "League(s)"}
+    cols_to_display = ["Average Rating", "Age", "Nation", "Matches Played", "Minutes Played", "Team(s)", "League(s)"]
 else:
-    cols_to_display = ["Average Rating", "Age", "Nation", "Matches Played", "Minutes Played", "Team"]
-    rename_cols = {"Team": "Team(s)"}
+    cols_to_display = ["Average Rating", "Age", "Nation", "Matches Played", "Minutes Played", "Team(s)"]
 
 st.dataframe(
-    df_top[cols_to_display].rename(columns=rename_cols),
+    df_top[cols_to_display],
     use_container_width=True
-)
\ No newline at end of file
+)
+
+show_profile()
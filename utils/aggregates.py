@@ -0,0 +1,136 @@
+# python -m utils.aggregates [season_code ...]
+# Materializes the rating aggregates of each season: one row per (League, Position, Player), with
+# the player's main position of the season, holding the sums the Top-performing players page needs
+# over all matchdays (rating sum and count, minutes and matches). Sums compose: the page adds up the
+# rows of the selected leagues and positions instead of rescanning every rated match.
+# Matchday ranges are served from the same sums accumulated matchday by matchday: for each
+# (League, Player), cumulative arrays over the season's matchdays, so the sums between any two
+# matchdays are the difference of two columns.
+import os
+import re
+import sys
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.convert import convert_file
+from utils.data import (
+    CACHE_ENTRIES, SEASONS, folder_version, season_path, parquet_path, read_season_table, table_version,
+    load_all_ratings,
+)
+from utils.players import load_main_positions
+from utils.profiling import rows, step
+from utils.schema import apply_schema
+
+AGGREGATES_FILE = ("aggregates", "ratings.csv")
+RATINGS_FILES = [("ratings", "data_players.csv"), ("ratings", "data_goals.csv")]
+AGGREGATE_KEYS = ["League", "Position", "Player"]
+AGGREGATE_COLUMNS = ["Rating Sum", "Rated Matches", "Minutes Played", "Matches Played"]
+
+
+def extract_matchday_num(j):
+    match = re.match(r"J(\d+)", str(j))
+    return int(match.group(1)) if match else -1
+
+
+def build_rating_aggregates(season_code: str) -> pd.DataFrame:
+    with step("rating aggregates"):
+        return rows(_build_rating_aggregates(season_code, folder_version(season_code, "ratings")))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _build_rating_aggregates(season_code: str, version: float) -> pd.DataFrame:
+    df = load_all_ratings(season_code, columns=("Player", "League", "Minutes", "Rating"))
+    df = df[df["Rating"].notna()].astype({"Rating": "float64"})
+    df["Position"] = df["Player"].map(load_main_positions(season_code)).astype("category")
+
+    grouped = df.groupby(AGGREGATE_KEYS, observed=True)
+    df_agg = grouped.agg(**{
+        "Rating Sum": ("Rating", "sum"),
+        "Rated Matches": ("Rating", "count"),
+        "Minutes Played": ("Minutes", "sum"),
+        "Matches Played": ("Minutes", "count"),
+    }).reset_index()
+    # Same dtypes as when the file is read back
+    return apply_schema(df_agg)
+
+
+def has_rating_aggregates(season_code: str) -> bool:
+    # The file is only used while it is newer than the ratings it was built from
+    version = table_version(season_code, *AGGREGATES_FILE)
+    return version > 0 and all(version >= table_version(season_code, *parts) for parts in RATINGS_FILES)
+
+
+def load_rating_aggregates(season_code: str) -> pd.DataFrame:
+    # Reads the materialized table when it is up to date, builds it in memory otherwise
+    if has_rating_aggregates(season_code):
+        return read_season_table(season_code, *AGGREGATES_FILE, columns=tuple(AGGREGATE_KEYS + AGGREGATE_COLUMNS))
+    return build_rating_aggregates(season_code)
+
+
+def write_rating_aggregates(season_code: str) -> str:
+    path = season_path(season_code, *AGGREGATES_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    build_rating_aggregates(season_code).to_csv(path, index=False)
+    # Keep the Parquet copy read by the pages in sync
+    target = parquet_path(season_code, *AGGREGATES_FILE)
+    if os.path.exists(os.path.dirname(target)):
+        convert_file(path, target)
+    return path
+
+
+# ------------------------- Matchday ranges -------------------------
+def load_matchday_sums(season_code: str) -> tuple:
+    # (League, Position, Player) of each row, the matchdays in order, and the cumulative sums of
+    # AGGREGATE_COLUMNS, shaped (columns, rows, matchdays + 1): [:, :, j] sums the first j matchdays.
+    # The objects are shared between sessions and must not be modified.
+    with step("matchday sums"):
+        return _load_matchday_sums(season_code, folder_version(season_code, "ratings"))
+
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _load_matchday_sums(season_code: str, version: float) -> tuple:
+    df = load_all_ratings(season_code, columns=("Player", "League", "Game Week", "Minutes", "Rating"))
+    df = df[df["Rating"].notna() & df["Game Week"].notna()].astype({"Rating": "float64"})
+    matchdays = sorted(df["Game Week"].unique(), key=extract_matchday_num)
+
+    df_sums = df.groupby(["League", "Player", "Game Week"], observed=True).agg(**{
+        "Rating Sum": ("Rating", "sum"),
+        "Rated Matches": ("Rating", "count"),
+        "Minutes Played": ("Minutes", "sum"),
+        "Matches Played": ("Minutes", "count"),
+    })
+    # One row per (League, Player), one column per matchday, a leading column of zeros
+    sums = []
+    for col in AGGREGATE_COLUMNS:
+        df_wide = df_sums[col].unstack("Game Week", fill_value=0).reindex(columns=matchdays, fill_value=0)
+        sums.append(np.cumsum(df_wide.to_numpy(dtype="float64"), axis=1))
+    sums = np.pad(np.stack(sums), ((0, 0), (0, 0), (1, 0)))
+
+    df_keys = df_wide.index.to_frame(index=False)
+    df_keys.insert(1, "Position", df_keys["Player"].map(load_main_positions(season_code)).astype("category"))
+    return df_keys, matchdays, sums
+
+
+def matchday_range_aggregates(season_code: str, first: str, last: str) -> pd.DataFrame:
+    # Same rows and columns as load_rating_aggregates, over the matchdays from first to last
+    df_keys, matchdays, sums = load_matchday_sums(season_code)
+    start, end = matchdays.index(first), matchdays.index(last) + 1
+    totals = sums[:, :, end] - sums[:, :, start]
+    df_range = df_keys.assign(**dict(zip(AGGREGATE_COLUMNS, totals)))
+    return rows(df_range[df_range["Rated Matches"] > 0].astype({"Rated Matches": "int32", "Matches Played": "int32"}))
+
+
+def main(season_codes):
+    for season_code in season_codes:
+        try:
+            path = write_rating_aggregates(season_code)
+        except FileNotFoundError as e:
+            print(f"csv{season_code}: skipped ({e})")
+            continue
+        print(f"csv{season_code}: wrote {path}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or list(SEASONS.values()))
@@ -0,0 +1,54 @@
+# python -m utils.convert [season_code ...]
+# Writes a compressed Parquet copy of each season folder of csv/ into parquet/.
+# Loaders in utils.data read the Parquet copy when it exists and only parse the requested columns.
+# The files are independent: they are converted by a pool of threads, one per core.
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from utils.data import CSV_ROOT, SEASONS, season_folder, parquet_path
+
+COMPRESSION = "zstd"
+WORKERS = os.cpu_count() or 1
+
+
+def convert_file(csv_path, target_path):
+    df = pd.read_csv(csv_path)
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    os.makedirs(os.path.dirname(target_path), exist_ok=True)
+    # String columns are dictionary-encoded: Player, Team, League, Position... repeat on every row
+    pq.write_table(table, target_path, compression=COMPRESSION, use_dictionary=True)
+    return os.path.getsize(csv_path), os.path.getsize(target_path)
+
+
+def convert_season(season_code, workers=WORKERS):
+    folder = season_folder(season_code)
+    jobs = []
+    for root, _, files in os.walk(folder):
+        for file_name in sorted(files):
+            if not file_name.endswith(".csv"):
+                continue
+            parts = os.path.relpath(os.path.join(root, file_name), folder).split(os.sep)
+            jobs.append((os.path.join(root, file_name), parquet_path(season_code, *parts)))
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        sizes = list(pool.map(lambda job: convert_file(*job), jobs))
+    total_csv = sum(csv_size for csv_size, _ in sizes)
+    total_parquet = sum(parquet_size for _, parquet_size in sizes)
+    return total_csv, total_parquet
+
+
+def main(season_codes):
+    for season_code in season_codes:
+        if not os.path.isdir(season_folder(season_code)):
+            print(f"csv{season_code}: no folder in {CSV_ROOT}")
+            continue
+        total_csv, total_parquet = convert_season(season_code)
+        print(f"csv{season_code}: {total_csv / 1e6:.1f} MB of CSV -> {total_parquet / 1e6:.1f} MB of Parquet")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or list(SEASONS.values()))
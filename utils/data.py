@@ -0,0 +1,225 @@
+import os
+import threading
+from collections import Counter
+
+import pandas as pd
+import pyarrow.parquet as pq
+import streamlit as st
+
+from utils.profiling import rows, step
+from utils.schema import apply_schema, concat_frames, validate_columns
+
+# ------------------------- Paths -------------------------
+CSV_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "csv"))
+# Columnar copy of the csv/ tree written by `python -m utils.convert`
+PARQUET_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "parquet"))
+
+SEASONS = {
+    "2025-2026": "25_26",
+    "2024-2025": "24_25",
+    "2023-2024": "23_24",
+}
+DEFAULT_SEASON = "2024-2025"
+
+LEAGUE_GROUPS = {
+    "Big 5 + UCL + UEL + UECL": "TopLeagues",
+    "Others Leagues": "OthersLeagues",
+}
+
+# Upper bound on the number of cached frames per loader, shared by every session.
+CACHE_ENTRIES = 32
+# Column projections cached per season file
+PROJECTIONS_PER_FILE = 4
+
+
+def season_folder(season_code: str) -> str:
+    return os.path.join(CSV_ROOT, f"csv{season_code}")
+
+
+def season_path(season_code: str, *parts: str) -> str:
+    return os.path.join(season_folder(season_code), *parts)
+
+
+def parquet_path(season_code: str, *parts: str) -> str:
+    path = os.path.join(PARQUET_ROOT, f"csv{season_code}", *parts)
+    return os.path.splitext(path)[0] + ".parquet"
+
+
+def count_season_files() -> int:
+    return sum(name.endswith(".csv") for _, _, files in os.walk(CSV_ROOT) for name in files)
+
+
+# The file reads are sized on the season files rather than capped like the other caches: the pages and
+# the warm-up read every file of a season, often with a few projections each, which would not fit in
+# CACHE_ENTRIES and would evict each other. Counted once, when the module is imported.
+READ_CACHE_ENTRIES = max(CACHE_ENTRIES, PROJECTIONS_PER_FILE * count_season_files())
+
+
+# Reads that missed the cache, by (season_code, parts, columns), for `python -m utils.warmup --check`
+file_reads = Counter()
+_file_reads_lock = threading.Lock()
+
+
+def select_season(label: str = "Season") -> str:
+    seasons = list(SEASONS)
+    selected_season = st.sidebar.selectbox(label, seasons, index=seasons.index(DEFAULT_SEASON))
+    return SEASONS[selected_season]
+
+
+# ------------------------- Loaders -------------------------
+def source_path(season_code: str, *parts: str) -> str:
+    # File that will be read: the Parquet copy while it is at least as recent as its CSV, the CSV
+    # otherwise, so a CSV rewritten after the conversion is never hidden by a stale copy
+    csv_path = season_path(season_code, *parts)
+    path = parquet_path(season_code, *parts)
+    if os.path.exists(path) and (not os.path.exists(csv_path) or os.path.getmtime(path) >= os.path.getmtime(csv_path)):
+        return path
+    return csv_path
+
+
+def table_version(season_code: str, *parts: str) -> float:
+    # Modification time of the file that will be read. It is part of the cache keys below,
+    # so files rewritten by `python -m utils.ingest` are reloaded without restarting the server.
+    path = source_path(season_code, *parts)
+    return os.path.getmtime(path) if os.path.exists(path) else 0.0
+
+
+def folder_version(season_code: str, *folders: str) -> float:
+    # Latest modification time among the files of the given season sub-folders
+    versions = [0.0]
+    for folder in folders:
+        path = season_path(season_code, folder)
+        if os.path.isdir(path):
+            versions += [os.path.getmtime(os.path.join(path, file_name)) for file_name in os.listdir(path)]
+    return max(versions)
+
+
+def table_columns(season_code: str, *parts: str) -> list:
+    return _table_columns(season_code, parts, table_version(season_code, *parts))
+
+
+@st.cache_data(max_entries=READ_CACHE_ENTRIES, show_spinner=False)
+def _table_columns(season_code: str, parts: tuple, version: float) -> list:
+    path = source_path(season_code, *parts)
+    if path.endswith(".parquet"):
+        return pq.read_schema(path).names
+    return pd.read_csv(path, nrows=0).columns.tolist()
+
+
+def read_season_table(season_code: str, *parts: str, columns: tuple = None, where: dict = None) -> pd.DataFrame:
+    # where maps a column to the values to keep, e.g. {"Player": ["Jonathan David"]}
+    if where:
+        return read_filtered(season_code, parts, columns, where)
+    return _read_season_table(season_code, parts, columns, table_version(season_code, *parts))
+
+
+def available_columns(season_code: str, parts: tuple, columns: tuple) -> list:
+    # Requested columns missing from the file are skipped, like a concat would leave them empty
+    if columns is None:
+        return None
+    available = set(table_columns(season_code, *parts))
+    return [col for col in dict.fromkeys(columns) if col in available]
+
+
+@st.cache_data(max_entries=READ_CACHE_ENTRIES, show_spinner=False)
+def _read_season_table(season_code: str, parts: tuple, columns: tuple, version: float) -> pd.DataFrame:
+    # Reads the Parquet copy of a season file when it is up to date, the CSV otherwise, and applies the
+    # column schema (categoricals, 32-bit stats, parsed Age and Nation) before the frame is cached.
+    path = source_path(season_code, *parts)
+    with step(f"read {'/'.join(parts)}"):
+        if path.endswith(".parquet"):
+            df = pd.read_parquet(path, columns=available_columns(season_code, parts, columns))
+        else:
+            usecols = available_columns(season_code, parts, columns)
+            df = pd.read_csv(path, usecols=usecols)
+            df = df if usecols is None else df[usecols]
+
+        validate_columns(df, parts, columns)
+        with _file_reads_lock:
+            file_reads[season_code, parts, columns] += 1
+        return rows(apply_schema(df))
+
+
+def read_filtered(season_code: str, parts: tuple, columns: tuple, where: dict) -> pd.DataFrame:
+    # The Parquet reader keeps only the matching rows, which are not cached: every filter is a new query
+    # and would push whole-file reads out of the cache. A CSV cannot be filtered while it is parsed, so
+    # its cached projected read is filtered instead.
+    path = source_path(season_code, *parts)
+    if not path.endswith(".parquet"):
+        df = read_season_table(season_code, *parts, columns=columns)
+        for col, values in where.items():
+            df = df[df[col].isin(values)]
+        return df
+
+    filters = [(col, "in", list(values)) for col, values in where.items()]
+    with step(f"read {'/'.join(parts)} where {', '.join(where)}"):
+        df = pd.read_parquet(path, columns=available_columns(season_code, parts, columns), filters=filters)
+        validate_columns(df, parts, columns)
+        return rows(apply_schema(df))
+
+
+def load_ratings(season_code: str, goalkeepers: bool = False, columns: tuple = None, where: dict = None) -> pd.DataFrame:
+    file_name = "data_goals.csv" if goalkeepers else "data_players.csv"
+    return read_season_table(season_code, "ratings", file_name, columns=columns, where=where)
+
+
+def load_all_ratings(season_code: str, columns: tuple = None, where: dict = None) -> pd.DataFrame:
+    return concat_frames([
+        load_ratings(season_code, columns=columns, where=where),
+        load_ratings(season_code, goalkeepers=True, columns=columns, where=where),
+    ])
+
+
+def load_clean(season_code: str, goalkeepers: bool = False, columns: tuple = None) -> pd.DataFrame:
+    file_name = "data_goals.csv" if goalkeepers else "data_players.csv"
+    return read_season_table(season_code, "clean", file_name, columns=columns)
+
+
+def load_all_clean(season_code: str, columns: tuple = None) -> pd.DataFrame:
+    df_goalkeepers = load_clean(season_code, goalkeepers=True, columns=columns)
+    df_goalkeepers["Position"] = "GK"
+    return concat_frames([load_clean(season_code, columns=columns), df_goalkeepers])
+
+
+def load_centiles(season_code: str, leagues_name: str, kind: str = "centiles", goalkeepers: bool = False, columns: tuple = None, where: dict = None) -> pd.DataFrame:
+    # kind is one of "centiles", "adjusted" or "aggregated"
+    suffix = "_gk" if goalkeepers else ""
+    return read_season_table(season_code, "centiles", f"{leagues_name}_{kind}{suffix}.csv", columns=columns, where=where)
+
+
+def load_all_centiles(season_code: str, leagues_name: str, kind: str = "centiles", columns: tuple = None, where: dict = None) -> pd.DataFrame:
+    df_goalkeepers = load_centiles(season_code, leagues_name, kind, goalkeepers=True, columns=columns, where=where)
+    df_goalkeepers["Position"] = "GK"
+    return concat_frames([load_centiles(season_code, leagues_name, kind, columns=columns, where=where), df_goalkeepers])
+
+
+def load_metrics(season_code: str, leagues_name: str, kind: str = "metrics", goalkeepers: bool = False, columns: tuple = None, where: dict = None) -> pd.DataFrame:
+    # kind is one of "metrics" or "indices"
+    suffix = "_gk" if goalkeepers else ""
+    return read_season_table(season_code, "metrics", f"{leagues_name}_{kind}{suffix}.csv", columns=columns, where=where)
+
+
+def load_all_metrics(season_code: str, leagues_name: str, kind: str = "metrics", columns: tuple = None, where: dict = None) -> pd.DataFrame:
+    df_goalkeepers = load_metrics(season_code, leagues_name, kind, goalkeepers=True, columns=columns, where=where)
+    df_goalkeepers["Position"] = "GK"
+    return concat_frames([load_metrics(season_code, leagues_name, kind, columns=columns, where=where), df_goalkeepers])
+
+
+def load_teams(season_code: str, leagues_name: str, kind: str = "centiles", columns: tuple = None) -> pd.DataFrame:
+    # kind is one of "centiles", "adjusted" or "aggregated"
+    return read_season_table(season_code, "teams", f"{leagues_name}_{kind}.csv", columns=columns)
+
+
+def load_league_games(season_code: str, league: str, columns: tuple = None) -> pd.DataFrame:
+    return read_season_table(season_code, "leagues_games", f"{league}_games.csv", columns=columns)
+
+
+def list_game_leagues(season_code: str) -> list:
+    folder = season_path(season_code, "leagues_games")
+    if not os.path.isdir(folder):
+        return []
+    return sorted(
+        file_name[:-len("_games.csv")]
+        for file_name in os.listdir(folder)
+        if file_name.endswith("_games.csv")
+    )
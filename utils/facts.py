@@ -0,0 +1,76 @@
+# python -m utils.facts [season_code ...]
+# Materializes one player-match fact table per season: clean stats, rating, opponent, score, nation and age.
+import os
+import sys
+
+import pandas as pd
+import streamlit as st
+
+from utils.data import (
+    CACHE_ENTRIES, SEASONS, folder_version, season_path, parquet_path, read_season_table, table_version,
+    load_all_clean, load_all_ratings,
+)
+from utils.fixtures import add_opponent_score
+from utils.profiling import rows, step
+from utils.schema import apply_schema, parse_age, parse_nation
+
+FACTS_FILE = ("facts", "match_facts.csv")
+MATCH_KEYS = ["Player", "Game Week", "Team", "League", "Minutes", "Position"]
+
+
+def build_match_facts(season_code: str) -> pd.DataFrame:
+    with step("match facts"):
+        return rows(_build_match_facts(season_code, folder_version(season_code, "clean", "ratings", "leagues_games")))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _build_match_facts(season_code: str, version: float) -> pd.DataFrame:
+    df_clean = load_all_clean(season_code)
+    df_ratings = load_all_ratings(season_code)
+
+    df = df_clean.merge(df_ratings, on=MATCH_KEYS, how="left")
+
+    nationality_map = df_clean[["Player", "Nationality"]].drop_duplicates(subset="Player").set_index("Player")["Nationality"]
+    df["Nation"] = parse_nation(df["Player"].map(nationality_map))
+    df["Age"] = parse_age(df["Age"])
+
+    return apply_schema(add_opponent_score(df, season_code))
+
+
+def has_match_facts(season_code: str) -> bool:
+    return os.path.exists(season_path(season_code, *FACTS_FILE)) or os.path.exists(parquet_path(season_code, *FACTS_FILE))
+
+
+def match_facts_version(season_code: str) -> float:
+    if has_match_facts(season_code):
+        return table_version(season_code, *FACTS_FILE)
+    return folder_version(season_code, "clean", "ratings", "leagues_games")
+
+
+def load_match_facts(season_code: str, columns: tuple = None) -> pd.DataFrame:
+    # Reads the materialized table when it has been built, joins the season files in memory otherwise
+    if has_match_facts(season_code):
+        return read_season_table(season_code, *FACTS_FILE, columns=columns)
+    df = build_match_facts(season_code)
+    return df if columns is None else df[[col for col in columns if col in df.columns]]
+
+
+def write_match_facts(season_code: str) -> str:
+    path = season_path(season_code, *FACTS_FILE)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    build_match_facts(season_code).to_csv(path, index=False)
+    return path
+
+
+def main(season_codes):
+    for season_code in season_codes:
+        try:
+            path = write_match_facts(season_code)
+        except FileNotFoundError as e:
+            print(f"csv{season_code}: skipped ({e})")
+            continue
+        print(f"csv{season_code}: wrote {path}")
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:] or list(SEASONS.values()))
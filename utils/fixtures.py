@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import CACHE_ENTRIES, folder_version, list_game_leagues, load_all_ratings, load_league_games
+from utils.profiling import step
+
+FIXTURE_KEYS = ["League", "Game Week", "Team"]
+SHEET_COLUMNS = ["Player", "Rating"]
+
+
+# ------------------------- Fixture index -------------------------
+def load_fixture_index(season_code: str) -> pd.DataFrame:
+    # One row per (League, Game Week, Team) with the opponent, score, venue side and date of the match
+    return _load_fixture_index(season_code, folder_version(season_code, "leagues_games"))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _load_fixture_index(season_code: str, version: float) -> pd.DataFrame:
+    games = [
+        load_league_games(season_code, league).assign(League=league)
+        for league in list_game_leagues(season_code)
+    ]
+    if not games:
+        return pd.DataFrame(columns=FIXTURE_KEYS + ["Opponent", "Score", "Home/Away", "Date"])
+
+    df_games = pd.concat(games, ignore_index=True)
+    df_games["Fixture Order"] = range(len(df_games))
+
+    common = ["League", "Game Week", "Score", "Date", "Fixture Order"]
+    df_home = df_games[common + ["Home Team", "Away Team"]].rename(columns={"Home Team": "Team", "Away Team": "Opponent"})
+    df_home["Home/Away"] = "Home"
+    df_away = df_games[common + ["Away Team", "Home Team"]].rename(columns={"Away Team": "Team", "Home Team": "Opponent"})
+    df_away["Home/Away"] = "Away"
+
+    # A team appearing twice in the same week keeps its first fixture, in file order
+    df_index = (
+        pd.concat([df_home, df_away], ignore_index=True)
+        .sort_values("Fixture Order", kind="stable")
+        .drop_duplicates(subset=FIXTURE_KEYS)
+        .drop(columns=["Fixture Order"])
+    )
+    return df_index[FIXTURE_KEYS + ["Opponent", "Score", "Home/Away", "Date"]].reset_index(drop=True)
+
+
+# ------------------------- Match sheets -------------------------
+def load_match_sheets(season_code: str) -> tuple:
+    # (Player and Rating of every rated row, sorted by League, Game Week and Team then best rating first,
+    # {(League, Game Week, Team): (first row, end row)}): a team's sheet of a match is one slice.
+    # Shared between sessions: must not be modified.
+    with step("match sheets"):
+        return _load_match_sheets(season_code, folder_version(season_code, "ratings"))
+
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _load_match_sheets(season_code: str, version: float) -> tuple:
+    df = load_all_ratings(season_code)
+    sheet = df.groupby(FIXTURE_KEYS, observed=True, sort=False).ngroup().to_numpy()
+    # Ratings descending with missing ones last; equal ratings keep their file order
+    order = np.lexsort((np.arange(len(df)), -df["Rating"].to_numpy(dtype=float), sheet))
+    df = df.iloc[order].reset_index(drop=True)
+
+    sheet = sheet[order]
+    starts = np.flatnonzero(np.diff(sheet, prepend=-1))
+    ends = np.append(starts[1:], len(df))
+    keys = zip(*(df[key].to_numpy()[starts].astype(str) for key in FIXTURE_KEYS))
+    return df[SHEET_COLUMNS], dict(zip(keys, zip(starts.tolist(), ends.tolist())))
+
+
+def match_sheet(sheets: tuple, league: str, game_week: str, team: str) -> pd.DataFrame:
+    df_sheets, ranges = sheets
+    start, end = ranges.get((str(league), str(game_week), str(team)), (0, 0))
+    return df_sheets.iloc[start:end]
+
+
+def add_opponent_score(df: pd.DataFrame, season_code: str) -> pd.DataFrame:
+    df_fixtures = load_fixture_index(season_code)[FIXTURE_KEYS + ["Opponent", "Score"]]
+    df = df.drop(columns=["Opponent", "Score"], errors="ignore").merge(df_fixtures, on=FIXTURE_KEYS, how="left")
+    unmatched = df["Opponent"].isna()
+    df.loc[unmatched, "Opponent"] = "Unknown"
+    df.loc[unmatched, "Score"] = "N/A"
+    return df
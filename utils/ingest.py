@@ -0,0 +1,367 @@
+# python -m utils.ingest [season_code] [--rebuild] | python -m utils.ingest --check [season_code]
+# Incremental matchday ingestion for the in-progress season (LIVE_SEASON only).
+# Only the clean/ rows of matches not ingested yet are aggregated; they are added to running totals
+# kept in running/, from which the TopLeagues aggregated, adjusted, centiles and indices files are rewritten.
+# Limitations: clean/ only has the Top Leagues matches, so no OthersLeagues file is built, and the match
+# rows have no Born or Starts, so the files written here have no such columns. The indices average the
+# percentiles of the INDEX_STATS groups below, an estimate of the official indices: they are written to
+# estimates/, never to metrics/, which only holds official files. Files that were not written by
+# utils.ingest are never overwritten.
+# --check ingests a season's clean/ rows one matchday at a time, in memory, and compares the files
+# with a rebuild from all the rows; nothing is written.
+import io
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+from utils.aggregates import RATINGS_FILES, extract_matchday_num, write_rating_aggregates
+from utils.convert import convert_file
+from utils.data import SEASONS, season_path, parquet_path
+from utils.schema import parse_age
+from utils.percentiles import percentile_ranks
+
+LIVE_SEASON = "25_26"
+LEAGUES_NAME = "TopLeagues"
+# Estimated indices, kept apart from the official metrics/ files
+ESTIMATES_FOLDER = "estimates"
+
+MATCH_KEYS = ["League", "Game Week", "Team"]
+STINT_KEYS = ["Player", "Position", "Team", "League"]
+CLEAN_ID_COLUMNS = ["Player", "Game Week", "Team", "League", "Nationality", "Age", "Minutes", "Position"]
+IDENTITY_COLUMNS = ["Nationality", "Age"]
+METRICS_COLUMNS = ["Player", "Nation", "Position", "Team", "Age", "Matches Played", "Minutes Played"]
+# Sums are rounded so that adding matchdays one at a time gives the same totals as a rebuild
+TOTAL_DECIMALS = 6
+
+# Composite indices: average percentile of a group of stats, on the same 0-100 scale as metrics/
+INDEX_STATS = {
+    "Offensive Index": ["Goals", "Shots on Target", "Expected Assisted Goals (xA)", "Key Passes", "Successful Take-Ons", "Touches Attacking Penalty Area"],
+    "Passing Index": ["Passes Completed (Total)", "Passes Completed (Long)", "Passes into Final Third", "Progressive Passes", "Passes into Penalty Area"],
+    "Possession Index": ["Touches", "Progressive Carries", "Carries into Final Third", "Progressive Passes Received", "Touches Attacking Third"],
+    "Defensive Index": ["Tackles Won", "Interceptions", "Blocks", "Clearances", "Challenges Tackled", "Aerials Won"],
+}
+INDEX_STATS_GK = {
+    "Line Index": ["Saves", "Save Efficiency", "Crosses Stopped", "Goals Against"],
+    "Passes Index": ["Completed Long Passes", "Attempted Passes (excluding GK)", "Defensive Actions Outside Penalty Area"],
+}
+
+
+# ------------------------- Running totals -------------------------
+def running_path(season_code, name):
+    return season_path(season_code, "running", f"{name}.csv")
+
+
+def running_index(name):
+    return "Team" if name == "teams" else STINT_KEYS
+
+
+def read_running(season_code, name):
+    path = running_path(season_code, name)
+    if not os.path.exists(path):
+        return None
+    return pd.read_csv(path, index_col=running_index(name))
+
+
+def write_running(season_code, name, df):
+    path = running_path(season_code, name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_csv(path)
+
+
+def is_rate_column(col):
+    # Per-match ratios cannot be summed: they are kept as minute-weighted sums
+    return col.startswith("%") or "Efficiency" in col
+
+
+def stat_columns(df):
+    return [
+        col for col in df.columns
+        if col not in CLEAN_ID_COLUMNS and (pd.api.types.is_numeric_dtype(df[col]) or pd.api.types.is_bool_dtype(df[col]))
+    ]
+
+
+def summarize_rows(df_rows, stats):
+    # One row per (Player, Position, Team, League) with the sums of the given match rows
+    df = df_rows.copy()
+    df[stats] = df[stats].astype(float)
+    rates = [col for col in stats if is_rate_column(col)]
+    df[rates] = df[rates].mul(df["Minutes"], axis=0)
+    df["Matches Played"] = 1
+    df["Age"] = parse_age(df["Age"])
+
+    grouped = df.groupby(STINT_KEYS, sort=False)
+    sums = grouped[stats + ["Matches Played", "Minutes"]].sum(min_count=1).round(TOTAL_DECIMALS)
+    return sums.join(grouped.agg({"Nationality": "first", "Age": "max"}))
+
+
+def update_totals(df_totals, df_new):
+    if df_totals is None:
+        return df_new
+    sums = df_totals.drop(columns=IDENTITY_COLUMNS).add(df_new.drop(columns=IDENTITY_COLUMNS), fill_value=0)
+    sums = sums.round(TOTAL_DECIMALS)
+    identity = df_totals[IDENTITY_COLUMNS].combine_first(df_new[IDENTITY_COLUMNS])
+    identity["Age"] = pd.concat([df_totals["Age"], df_new["Age"]], axis=1).max(axis=1).reindex(identity.index)
+    return sums.join(identity)
+
+
+# ------------------------- Derived files -------------------------
+def player_aggregates(df_totals, stats):
+    df = df_totals.reset_index()
+
+    # Main position: most matches played, then alphabetical like Series.mode()
+    main_position = (
+        df.groupby(["Player", "Position"], as_index=False)["Matches Played"].sum()
+        .sort_values(["Matches Played", "Position"], ascending=[False, True])
+        .drop_duplicates("Player")
+        .set_index("Player")["Position"]
+    )
+    main_team = (
+        df.groupby(["Player", "Team"], as_index=False)["Minutes"].sum()
+        .sort_values(["Minutes", "Team"], ascending=[False, True])
+        .drop_duplicates("Player")
+        .set_index("Player")["Team"]
+    )
+    grouped = df.groupby("Player")
+    sums = grouped[stats + ["Matches Played", "Minutes"]].sum(min_count=1)
+    identity = grouped.agg({"Nationality": "first", "Age": "max"})
+
+    rates = [col for col in stats if is_rate_column(col)]
+    sums[rates] = sums[rates].div(sums["Minutes"].replace(0, np.nan), axis=0)
+
+    df_agg = pd.DataFrame({
+        "Nation": identity["Nationality"],
+        "Position": main_position,
+        "Team": main_team,
+        "Age": identity["Age"].astype("Int64"),
+        "Matches Played": sums["Matches Played"].astype(int),
+        "Minutes Played": sums["Minutes"].astype(int),
+    })
+    df_agg = df_agg.join(sums[stats].round(2))
+    df_agg.index.name = "Player"
+    return df_agg.reset_index()
+
+
+def per_90(df_agg, stats, minutes_col="Minutes Played", scale=90):
+    df_adj = df_agg.copy()
+    counts = [col for col in stats if not is_rate_column(col)]
+    minutes = df_adj[minutes_col].replace(0, np.nan)
+    df_adj[counts] = df_adj[counts].div(minutes, axis=0).mul(scale).round(2)
+    return df_adj
+
+
+def centiles(df_adj, stats, by="Position"):
+    df_cent = df_adj.copy()
+    df_cent[stats] = percentile_ranks(df_adj, stats, by=by)
+    return df_cent
+
+
+def indices(df_cent, index_stats, identity_cols):
+    df_idx = df_cent[identity_cols].copy()
+    for index_name, stats in index_stats.items():
+        stats = [col for col in stats if col in df_cent.columns]
+        df_idx[index_name] = df_cent[stats].mean(axis=1).round() if stats else np.nan
+    return df_idx
+
+
+def team_aggregates(df_totals):
+    df = df_totals.copy()
+    minutes = df["Minutes"].replace(0, np.nan)
+    rates = [col for col in df.columns if is_rate_column(col)]
+    df[rates] = df[rates].div(minutes, axis=0).round(2)
+    df["Average Age"] = (df["Age Minutes"] / minutes).round(1)
+    df["Matches Played"] = df["Matches Played"].astype(int)
+    df = df.drop(columns=["Age Minutes", "Minutes"])
+    first = ["Average Age", "Matches Played"]
+    df = df[first + [col for col in df.columns if col not in first]]
+    df.index.name = "Team"
+    # Alphabetical, like the official files and whatever order the matches were added in
+    return df.sort_index().reset_index()
+
+
+def summarize_team_rows(df_rows, stats, by="Team"):
+    df = df_rows.copy()
+    df[stats] = df[stats].astype(float)
+    rates = [col for col in stats if is_rate_column(col)]
+    df[rates] = df[rates].mul(df["Minutes"], axis=0)
+    df["Age Minutes"] = parse_age(df["Age"]).astype(float) * df["Minutes"]
+    return df.groupby(by, sort=False)[stats + ["Minutes", "Age Minutes"]].sum(min_count=1).round(TOTAL_DECIMALS)
+
+
+# ------------------------- Ingestion -------------------------
+def read_clean(season_code, file_name):
+    path = season_path(season_code, "clean", file_name)
+    return pd.read_csv(path) if os.path.exists(path) else None
+
+
+def read_clean_rows(season_code):
+    df_players = read_clean(season_code, "data_players.csv")
+    df_goalkeepers = read_clean(season_code, "data_goals.csv")
+    if df_goalkeepers is not None:
+        df_goalkeepers["Position"] = "GK"
+    return df_players, df_goalkeepers
+
+
+def new_rows(df, ingested):
+    keys = df[MATCH_KEYS].astype(str).agg("|".join, axis=1)
+    return df[~keys.isin(ingested)], set(keys)
+
+
+def ingest_rows(running, df_players, df_goalkeepers, ingested):
+    # Adds the clean/ rows of the matches not in ingested to the running totals {name: frame} of
+    # "players", "players_gk" and "teams"; returns the updated totals, the match keys seen and the
+    # number of new rows
+    running = dict(running)
+    seen = set()
+    df_team_rows = []
+    n_rows = 0
+    for df_clean, name in [(df_players, "players"), (df_goalkeepers, "players_gk")]:
+        if df_clean is None:
+            continue
+        stats = stat_columns(df_clean)
+        df_new, keys = new_rows(df_clean, ingested)
+        seen |= keys
+        n_rows += len(df_new)
+        if not df_new.empty:
+            df_team_rows.append((df_new, stats))
+            running[name] = update_totals(running.get(name), summarize_rows(df_new, stats))
+
+    # Teams: outfield and goalkeeper stats of the new matches summed per team
+    if df_team_rows:
+        df_update = None
+        for df_new, stats in df_team_rows:
+            df_sums = summarize_team_rows(df_new, stats)
+            df_update = df_sums if df_update is None else df_update.add(df_sums, fill_value=0)
+        # A match is counted once even when both the outfield and goalkeeper files have it
+        df_matches = pd.concat([df_new[MATCH_KEYS] for df_new, _ in df_team_rows]).drop_duplicates()
+        df_update["Matches Played"] = df_matches.groupby("Team").size()
+        df_team_totals = running.get("teams")
+        df_team_totals = df_update if df_team_totals is None else df_team_totals.add(df_update, fill_value=0)
+        running["teams"] = df_team_totals.round(TOTAL_DECIMALS)
+    return running, seen, n_rows
+
+
+def derived_files(running):
+    # {(folder, file name): frame} of the files built from the running totals
+    files = {}
+    for name, suffix, index_stats in [("players", "", INDEX_STATS), ("players_gk", "_gk", INDEX_STATS_GK)]:
+        df_totals = running.get(name)
+        if df_totals is None:
+            continue
+        stats = [col for col in df_totals.columns if col not in IDENTITY_COLUMNS + ["Matches Played", "Minutes"]]
+        df_agg = player_aggregates(df_totals, stats)
+        df_adj = per_90(df_agg, stats)
+        df_cent = centiles(df_adj, stats)
+        df_metrics = indices(df_cent, index_stats, METRICS_COLUMNS)
+
+        files["centiles", f"{LEAGUES_NAME}_aggregated{suffix}.csv"] = df_agg
+        files["centiles", f"{LEAGUES_NAME}_adjusted{suffix}.csv"] = df_adj
+        files["centiles", f"{LEAGUES_NAME}_centiles{suffix}.csv"] = df_cent
+        files[ESTIMATES_FOLDER, f"{LEAGUES_NAME}_metrics{suffix}.csv"] = df_metrics
+        files[ESTIMATES_FOLDER, f"{LEAGUES_NAME}_indices{suffix}.csv"] = df_metrics.drop(columns=["Player"])
+
+    if running.get("teams") is not None:
+        df_team_agg = team_aggregates(running["teams"])
+        team_stats = [col for col in df_team_agg.columns if col not in ["Team", "Average Age", "Matches Played"]]
+        df_team_adj = per_90(df_team_agg, team_stats, minutes_col="Matches Played", scale=1)
+        df_team_cent = centiles(df_team_adj, team_stats, by=None)
+        files["teams", f"{LEAGUES_NAME}_aggregated.csv"] = df_team_agg
+        files["teams", f"{LEAGUES_NAME}_adjusted.csv"] = df_team_adj
+        files["teams", f"{LEAGUES_NAME}_centiles.csv"] = df_team_cent
+    return files
+
+
+def write_derived(season_code, folder, file_name, df):
+    path = season_path(season_code, folder, file_name)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    df.to_csv(path, index=False)
+    # Keep the Parquet copy read by the pages in sync
+    target = parquet_path(season_code, folder, file_name)
+    if os.path.exists(os.path.dirname(target)):
+        convert_file(path, target)
+
+
+def ingest(season_code=LIVE_SEASON, rebuild=False):
+    if season_code != LIVE_SEASON:
+        raise ValueError(f"only the live season csv{LIVE_SEASON} is ingested, not csv{season_code}")
+    ledger_path = running_path(season_code, "ingested")
+    ingested = set()
+    if os.path.exists(ledger_path) and not rebuild:
+        ingested = set(pd.read_csv(ledger_path)["Match"])
+
+    df_players, df_goalkeepers = read_clean_rows(season_code)
+    if df_players is None and df_goalkeepers is None:
+        print(f"csv{season_code}: no clean/ data to ingest")
+        return 0
+
+    running = {}
+    if not rebuild:
+        running = {name: read_running(season_code, name) for name in ["players", "players_gk", "teams"]}
+        running = {name: df for name, df in running.items() if df is not None}
+    updated, seen, n_rows = ingest_rows(running, df_players, df_goalkeepers, ingested)
+    files = derived_files(updated)
+
+    # Before the first ingestion, the season's folders must not hold files from another source
+    if not os.path.exists(ledger_path):
+        existing = [season_path(season_code, *parts) for parts in files if os.path.exists(season_path(season_code, *parts))]
+        if existing:
+            raise FileExistsError(f"not written by utils.ingest, left untouched: {', '.join(existing)}")
+
+    for name, df_totals in updated.items():
+        if df_totals is not running.get(name):
+            write_running(season_code, name, df_totals)
+    for (folder, file_name), df in files.items():
+        write_derived(season_code, folder, file_name, df)
+
+    # Rating aggregates of the Top-performing players page, once the season's ratings are in
+    if any(os.path.exists(season_path(season_code, *parts)) for parts in RATINGS_FILES):
+        write_rating_aggregates(season_code)
+
+    os.makedirs(os.path.dirname(ledger_path), exist_ok=True)
+    pd.DataFrame({"Match": sorted(ingested | seen)}).to_csv(ledger_path, index=False)
+    print(f"csv{season_code}: ingested {n_rows} new match rows")
+    return n_rows
+
+
+# ------------------------- Check -------------------------
+def check(season_code):
+    # Ingests the season's clean/ rows one more matchday at a time, with the running totals going
+    # through CSV like between two runs, and compares the files with a rebuild from all the rows
+    df_players, df_goalkeepers = read_clean_rows(season_code)
+    if df_players is None and df_goalkeepers is None:
+        raise FileNotFoundError(f"csv{season_code} has no clean/ data")
+    frames = [df for df in (df_players, df_goalkeepers) if df is not None]
+    matchdays = sorted(pd.concat([df["Game Week"] for df in frames]).dropna().astype(str).unique(), key=extract_matchday_num)
+
+    rebuilt = derived_files(ingest_rows({}, df_players, df_goalkeepers, set())[0])
+    running, ingested = {}, set()
+    for i in range(len(matchdays)):
+        batch = [
+            None if df is None else df[df["Game Week"].astype(str).isin(matchdays[:i + 1])]
+            for df in (df_players, df_goalkeepers)
+        ]
+        running, seen, _ = ingest_rows(running, *batch, ingested)
+        running = {name: pd.read_csv(io.StringIO(df.to_csv()), index_col=running_index(name)) for name, df in running.items()}
+        ingested |= seen
+
+    incremental = derived_files(running)
+    assert incremental.keys() == rebuilt.keys(), f"files differ: {sorted(incremental)} != {sorted(rebuilt)}"
+    for parts, df in incremental.items():
+        pd.testing.assert_frame_equal(df, rebuilt[parts], obj="/".join(parts))
+    return len(matchdays), len(incremental)
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith("--")]
+    season_code = args[0] if args else LIVE_SEASON
+    if season_code not in SEASONS.values():
+        sys.exit(f"Unknown season code: {season_code}")
+    if "--check" in sys.argv:
+        n_matchdays, n_files = check(season_code)
+        print(f"csv{season_code}: {n_files} files ingested over {n_matchdays} matchdays match a rebuild")
+    else:
+        try:
+            ingest(season_code, rebuild="--rebuild" in sys.argv)
+        except (ValueError, FileExistsError) as e:
+            sys.exit(f"csv{season_code}: {e}")
@@ -0,0 +1,88 @@
+# Top-N leaderboards served from presorted row orders.
+# For each (table, stat) the rows holding a value are sorted once, best first, and the order is kept
+# in the shared cache until the table changes. A query walks that order in growing chunks, applies the
+# page filters (position, league, age, minutes) to the chunk only and stops as soon as N rows pass,
+# instead of filtering the whole season and sorting it again on every rerun.
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import CACHE_ENTRIES, load_all_centiles, table_version
+from utils.facts import load_match_facts, match_facts_version
+from utils.profiling import rows, step
+from utils.schema import parse_age
+
+FIRST_CHUNK = 256
+
+
+# ------------------------- Orders -------------------------
+def stat_order(values: pd.Series) -> np.ndarray:
+    # Row positions of the non-missing values, highest first; ties keep the table order
+    values = values.to_numpy(dtype=float)
+    valid = np.flatnonzero(~np.isnan(values))
+    return valid[np.argsort(-values[valid], kind="stable")].astype(np.int32)
+
+
+def match_stat_order(season_code: str, stat: str) -> np.ndarray:
+    return _match_stat_order(season_code, stat, match_facts_version(season_code))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES * 4, show_spinner=False)
+def _match_stat_order(season_code: str, stat: str, version: float) -> np.ndarray:
+    return stat_order(load_match_facts(season_code, columns=(stat,))[stat])
+
+
+def season_stat_order(season_code: str, leagues_name: str, kind: str, stat: str) -> np.ndarray:
+    # Row positions in load_all_centiles(season_code, leagues_name, kind): outfield file then goalkeepers,
+    # one row per player
+    version = max(
+        table_version(season_code, "centiles", f"{leagues_name}_{kind}{suffix}.csv") for suffix in ("", "_gk")
+    )
+    return _season_stat_order(season_code, leagues_name, kind, stat, version)
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES * 4, show_spinner=False)
+def _season_stat_order(season_code: str, leagues_name: str, kind: str, stat: str, version: float) -> np.ndarray:
+    # Player is read along with the stat so that a file without the stat still counts its rows
+    df = load_all_centiles(season_code, leagues_name, kind, columns=("Player", stat))
+    values = df.reindex(columns=[stat])[stat]
+    # A goalkeeper has a row in both files: only the last row holding the stat, the goalkeeper's, is
+    # ranked, so that a player cannot appear twice in a top N
+    valid = values.notna()
+    duplicate = df["Player"].where(valid).duplicated(keep="last") & valid
+    return stat_order(values.mask(duplicate))
+
+
+# ------------------------- Queries -------------------------
+def filter_mask(df: pd.DataFrame, positions: list = None, leagues: list = None, age_max: int = None,
+                min_minutes: int = None, minutes_column: str = "Minutes Played", required: tuple = ()) -> np.ndarray:
+    mask = np.ones(len(df), dtype=bool)
+    if positions is not None:
+        mask &= df["Position"].isin(positions).to_numpy()
+    if leagues is not None:
+        mask &= df["League"].isin(leagues).to_numpy()
+    if age_max is not None:
+        mask &= (parse_age(df["Age"]) <= age_max).fillna(False).to_numpy(dtype=bool)
+    if min_minutes:
+        mask &= (df[minutes_column] >= min_minutes).to_numpy()
+    for col in required:
+        mask &= df[col].notna().to_numpy()
+    return mask
+
+
+def top_rows(df: pd.DataFrame, order: np.ndarray, n: int, **filters) -> pd.DataFrame:
+    # First n rows of `order` passing the filters. The chunk size doubles on each step, so sparse
+    # filters (one small league, young players) still finish in a few steps.
+    with step("top rows"):
+        taken, found, start = [], 0, 0
+        size = max(4 * n, FIRST_CHUNK)
+        while found < n and start < len(order):
+            chunk = df.iloc[order[start:start + size]]
+            chunk = chunk[filter_mask(chunk, **filters)]
+            taken.append(chunk)
+            found += len(chunk)
+            start += size
+            size *= 2
+        if not taken:
+            return rows(df.iloc[:0])
+        return rows(pd.concat(taken).head(n))
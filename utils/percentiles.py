@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+
+from utils.schema import parse_age
+
+# Stats where a lower value is better: ranked in reverse, like in the centiles files
+NEGATIVE_STATS = [
+    "Challenges Lost", "Errors", "Miscontrols", "Dispossessed",
+    "Yellow Cards", "Red Cards", "Second Yellow Cards",
+    "Fouls Committed", "Offsides", "Penalties Conceded", "Own Goals",
+    "Aerial Duels Lost", "Ball Losses", "Goals Against",
+]
+
+
+def percentile_ranks(df: pd.DataFrame, columns: list, by: str = None) -> pd.DataFrame:
+    # Same scale as the *_centiles.csv files: floor(percentile rank * 100), within each `by` group.
+    # Missing values (a % stat without attempts) are ranked 0, like in the files.
+    grouped = df.groupby(by, observed=True) if by else df
+    positive = [col for col in columns if col not in NEGATIVE_STATS]
+    negative = [col for col in columns if col in NEGATIVE_STATS]
+    ranks = pd.concat(
+        [grouped[positive].rank(pct=True), grouped[negative].rank(pct=True, ascending=False)],
+        axis=1
+    )
+    return np.floor(ranks[columns] * 100).fillna(0)
+
+
+def peer_percentiles(df_peers: pd.DataFrame, df_targets: pd.DataFrame, columns: list) -> pd.DataFrame:
+    # Percentile of each target row within the peer rows, on the centiles files' scale.
+    # Each column of the peer group is sorted once; every target is then placed with a binary search,
+    # which gives the same average rank as DataFrame.rank(pct=True) for targets inside the group.
+    # Missing target values are ranked 0, like in the files.
+    # One contiguous row per stat; NaN values are sorted last and left out of the group size
+    peers_sorted = np.sort(df_peers[columns].to_numpy(dtype=float).T, axis=1)
+    targets = df_targets[columns].to_numpy(dtype=float).T
+    counts = (~np.isnan(peers_sorted)).sum(axis=1)
+
+    result = np.zeros(targets.shape)
+    for j, col in enumerate(columns):
+        n = counts[j]
+        if n == 0:
+            continue
+        values = peers_sorted[j, :n]
+        x = targets[j]
+        below = np.searchsorted(values, x, side="left")
+        up_to = np.searchsorted(values, x, side="right")
+        ties = (up_to - below + 1) / 2
+        ranks = (n - up_to + ties) if col in NEGATIVE_STATS else (below + ties)
+        ranks[np.isnan(x)] = 0
+        result[j] = ranks / n
+
+    return pd.DataFrame(np.floor(result.T * 100), index=df_targets.index, columns=columns)
+
+
+def peer_group_mask(df: pd.DataFrame, positions: list = None, players: list = None, min_minutes: int = 0, age_range: tuple = None) -> pd.Series:
+    # Rows of an adjusted frame belonging to the peer group
+    mask = pd.Series(True, index=df.index)
+    if positions:
+        mask &= df["Position"].isin(positions)
+    if players is not None:
+        mask &= df["Player"].isin(players)
+    if min_minutes:
+        mask &= df["Minutes Played"] >= min_minutes
+    if age_range:
+        mask &= parse_age(df["Age"]).between(*age_range).fillna(False).astype(bool)
+    return mask
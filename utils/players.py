@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import CACHE_ENTRIES, folder_version, load_all_centiles, load_all_ratings, load_centiles
+from utils.profiling import rows, step
+from utils.schema import parse_age, parse_nation
+
+
+# ------------------------- Main position -------------------------
+def main_positions(df: pd.DataFrame, matchdays: list = None) -> pd.Series:
+    # Most frequent position of each player, ties broken alphabetically like Series.mode().
+    # Counts are taken in one bincount over (player, position) codes instead of a mode() per player.
+    if matchdays is not None:
+        df = df[df["Game Week"].isin(matchdays)]
+    df = df.dropna(subset=["Player", "Position"])
+
+    player_idx, players = pd.factorize(df["Player"], sort=True)
+    position_idx, positions = pd.factorize(df["Position"], sort=True)
+    counts = np.bincount(
+        player_idx * len(positions) + position_idx, minlength=len(players) * len(positions)
+    ).reshape(len(players), len(positions))
+
+    return pd.Series(positions[counts.argmax(axis=1)], index=pd.Index(players, name="Player"), name="Main Position")
+
+
+def load_main_positions(season_code: str, matchdays: tuple = None) -> pd.Series:
+    # Main position over the rated matches of the season, or over the given matchdays only
+    with step("main positions"):
+        return rows(_load_main_positions(season_code, matchdays, folder_version(season_code, "ratings")))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _load_main_positions(season_code: str, matchdays: tuple, version: float) -> pd.Series:
+    df = load_all_ratings(season_code, columns=("Player", "Game Week", "Position", "Rating"))
+    df = df[df["Rating"].notna()]
+    return main_positions(df, None if matchdays is None else list(matchdays))
+
+
+# ------------------------- Player dimension -------------------------
+def joined_values(df: pd.DataFrame, keys: list, column: str) -> pd.Series:
+    # ", ".join(sorted(set(values))) per key, from one sort of the distinct (key, value) pairs
+    pairs = df[keys + [column]].dropna().drop_duplicates().sort_values(keys + [column])
+    return pairs.groupby(keys, observed=True)[column].agg(", ".join)
+
+
+def load_player_dimension(season_code: str, leagues_name: str = "TopLeagues") -> pd.DataFrame:
+    # One row per player of the league group: Nation (code), Age (years), Main Position, Team(s),
+    # League(s), Minutes Played, Matches Played, Average Rating (mean of the match ratings) and
+    # Weighted Rating (weighted by minutes). Other leagues have no ratings: the team comes from the
+    # aggregated file and the rating columns are empty.
+    with step("player dimension"):
+        return rows(_load_player_dimension(season_code, leagues_name, folder_version(season_code, "ratings", "centiles")))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _load_player_dimension(season_code: str, leagues_name: str, version: float) -> pd.DataFrame:
+    df_identity = load_all_centiles(
+        season_code, leagues_name, "aggregated",
+        columns=("Player", "Nation", "Age", "Position", "Team", "Minutes Played", "Matches Played")
+    ).drop_duplicates("Player").set_index("Player")
+
+    df_dim = pd.DataFrame({
+        "Nation": parse_nation(df_identity["Nation"]),
+        "Age": parse_age(df_identity["Age"]),
+    })
+
+    if leagues_name != "TopLeagues":
+        df_dim["Main Position"] = df_identity["Position"]
+        df_dim["Team(s)"] = df_identity["Team"]
+        df_dim["League(s)"] = np.nan
+        df_dim["Minutes Played"] = df_identity["Minutes Played"]
+        df_dim["Matches Played"] = df_identity["Matches Played"]
+        df_dim["Average Rating"] = np.nan
+        df_dim["Weighted Rating"] = np.nan
+        return df_dim
+
+    df_ratings = load_all_ratings(season_code, columns=("Player", "Team", "League", "Minutes", "Rating"))
+    rated = df_ratings[df_ratings["Rating"].notna() & (df_ratings["Minutes"] > 0)]
+    grouped = df_ratings.groupby("Player", observed=True)
+    weighted = (rated["Rating"] * rated["Minutes"]).groupby(rated["Player"], observed=True).sum() / rated.groupby("Player", observed=True)["Minutes"].sum()
+
+    df_players = pd.DataFrame({
+        "Main Position": load_main_positions(season_code),
+        "Team(s)": joined_values(df_ratings, ["Player"], "Team"),
+        "League(s)": joined_values(df_ratings, ["Player"], "League"),
+        "Minutes Played": grouped["Minutes"].sum(),
+        "Matches Played": grouped["Minutes"].count(),
+        "Average Rating": grouped["Rating"].mean(),
+        "Weighted Rating": weighted,
+    })
+    df_dim = df_dim.join(df_players, how="outer")
+    df_dim[["Minutes Played", "Matches Played"]] = df_dim[["Minutes Played", "Matches Played"]].astype("Int64")
+    df_dim.index.name = "Player"
+    return df_dim
+
+
+def load_player_ratings(season_code: str, matchdays: tuple = None) -> pd.DataFrame:
+    # Average Rating, Team(s) and League(s) of each player over the whole season, like the player
+    # dimension, or over the given matchdays only
+    with step("player ratings"):
+        return rows(_load_player_ratings(season_code, matchdays, folder_version(season_code, "ratings")))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _load_player_ratings(season_code: str, matchdays: tuple, version: float) -> pd.DataFrame:
+    df_ratings = load_all_ratings(season_code, columns=("Player", "Game Week", "Team", "League", "Rating"))
+    if matchdays is not None:
+        df_ratings = df_ratings[df_ratings["Game Week"].isin(matchdays)]
+    return pd.DataFrame({
+        "Average Rating": df_ratings.groupby("Player", observed=True)["Rating"].mean(),
+        "Team(s)": joined_values(df_ratings, ["Player"], "Team"),
+        "League(s)": joined_values(df_ratings, ["Player"], "League"),
+    })
+
+
+def load_league_teams(season_code: str) -> pd.Series:
+    # Team(s) of each player within one league, indexed by (Player, League)
+    with step("league teams"):
+        return rows(_load_league_teams(season_code, folder_version(season_code, "ratings")))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _load_league_teams(season_code: str, version: float) -> pd.Series:
+    df_ratings = load_all_ratings(season_code, columns=("Player", "Team", "League"))
+    return joined_values(df_ratings, ["Player", "League"], "Team").rename("Team(s)")
+
+
+# ------------------------- Player profiles -------------------------
+# Identity columns of the adjusted files, never shown as profile stats
+PROFILE_EXCLUDED = ["Player", "Position", "Matches Played", "Minutes Played", "Age", "Nation", "Born", "Squad", "Team(s)", "Starts"]
+
+
+def load_player_profiles(season_code: str, leagues_name: str, goalkeepers: bool = False) -> tuple:
+    # (adjusted rows indexed by Player, valid stats of each player). A stat is valid for a player when
+    # its value is present and, for numeric stats, not 0.
+    with step("player profiles"):
+        return _load_player_profiles(season_code, leagues_name, goalkeepers, folder_version(season_code, "centiles"))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _load_player_profiles(season_code: str, leagues_name: str, goalkeepers: bool, version: float) -> tuple:
+    df_adj = load_centiles(season_code, leagues_name, "adjusted", goalkeepers=goalkeepers)
+    df_adj = df_adj.drop_duplicates("Player").set_index("Player")
+
+    stats = [col for col in df_adj.columns if col not in PROFILE_EXCLUDED]
+    valid = df_adj[stats].notna().to_numpy()
+    for j, col in enumerate(stats):
+        if pd.api.types.is_numeric_dtype(df_adj[col]):
+            valid[:, j] &= (df_adj[col] != 0).to_numpy()
+
+    columns = np.array(stats, dtype=object)
+    valid_stats = pd.Series([tuple(columns[row]) for row in valid], index=df_adj.index, name="Valid Stats")
+    return df_adj, valid_stats
+
+
+def player_profile(df_adj: pd.DataFrame, valid_stats: pd.Series, df_percentiles: pd.DataFrame, player: str) -> pd.DataFrame:
+    # Per 90 (or percentage) value and percentile of each valid stat of one player, from indexed rows.
+    # df_percentiles is indexed by Player; only the stats it has are kept.
+    if player not in valid_stats.index or player not in df_percentiles.index:
+        stats = []
+    else:
+        stats = [stat for stat in valid_stats[player] if stat in df_percentiles.columns]
+    return pd.DataFrame({
+        "Stat": stats,
+        "Per 90 min or Percentage": df_adj.loc[player, stats].to_numpy() if stats else [],
+        "Percentile": df_percentiles.loc[player, stats].to_numpy() if stats else [],
+    }).set_index("Stat")
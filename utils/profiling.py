@@ -0,0 +1,148 @@
+# Page phases. Pages mark the start of each phase with phase("load"), phase("filter"), phase("merge")
+# and phase("render"); a new run starts at "load". The wall time of each phase, and its peak memory
+# when tracemalloc is tracing (as in benchmarks/pages.py), are kept in the session state.
+# Steps inside a phase (file reads, concats, masks, joins, charts) are timed with `with step(name):`
+# and rows(df) notes the number of rows coming out of the current step or phase.
+# Profiling mode is opt-in with ?profile=1 in the page URL or the PROFILE environment variable: every
+# closed phase and step is logged as one JSON line, and show_profile() at the bottom of a page draws the
+# breakdown of the run in the sidebar.
+# tracemalloc is process-wide, so a session never turns it on or off: memory is measured when tracing
+# runs for the whole process, started by PROFILE, PYTHONTRACEMALLOC or benchmarks/pages.py. The
+# allocations and peaks of a session then include those of the sessions running at the same time, and
+# a phase starting in another session resets the peak: per-session memory is approximate.
+import json
+import os
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+from streamlit.logger import get_logger
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+PHASES = ("load", "filter", "merge", "render")
+RECORDS_KEY = "_profiling_phases"
+ENABLED_KEY = "_profiling_enabled"
+
+logger = get_logger(__name__)
+
+
+# PROFILE profiles every session: memory is then traced for the whole process, from the start
+if os.environ.get("PROFILE") and not tracemalloc.is_tracing():
+    tracemalloc.start()
+
+
+def _session():
+    # None outside a page run (command line, background threads): nothing is recorded there
+    return st.session_state if get_script_run_ctx(suppress_warning=True) is not None else None
+
+
+def _memory_mb(peak: bool = True) -> float | None:
+    # None when memory is not traced
+    return tracemalloc.get_traced_memory()[peak] / 1e6 if tracemalloc.is_tracing() else None
+
+
+def profiling_enabled() -> bool:
+    return bool(os.environ.get("PROFILE")) or st.query_params.get("profile", "0") not in ("", "0")
+
+
+def _close(record: dict, end: float, log: bool):
+    record["seconds"] = end - record.pop("start")
+    start_mb, end_mb = record.pop("start_mb"), _memory_mb(peak=False)
+    if start_mb is not None and end_mb is not None:
+        record["alloc_mb"] = round(end_mb - start_mb, 1)
+        if "step" not in record:
+            record["peak_mb"] = round(_memory_mb(), 1)
+    if log:
+        logger.info(json.dumps({"profile": record}))
+
+
+def close_records(records: list, end: float = None, log: bool = False) -> list:
+    # Closes the phase (and steps) still open when the script ended (st.stop() or end of the page)
+    end = time.perf_counter() if end is None else end
+    for record in records:
+        if "seconds" not in record:
+            _close(record, end, log)
+    return records
+
+
+def phase(name: str):
+    session = _session()
+    if session is None:
+        return
+    if name == PHASES[0]:
+        session[RECORDS_KEY] = []
+        session[ENABLED_KEY] = profiling_enabled()
+    else:
+        close_records(session.get(RECORDS_KEY, []), log=session.get(ENABLED_KEY, False))
+    if tracemalloc.is_tracing():
+        tracemalloc.reset_peak()
+    session.setdefault(RECORDS_KEY, []).append(
+        {"phase": name, "start": time.perf_counter(), "start_mb": _memory_mb(peak=False)}
+    )
+
+
+@contextmanager
+def step(name: str):
+    session = _session()
+    records = session.get(RECORDS_KEY) if session is not None else None
+    if not records:
+        yield
+        return
+    # Steps run inside other steps (a file read inside a join) are nested one level deeper
+    depth = sum(1 for record in records if "step" in record and "seconds" not in record)
+    record = {
+        "phase": records[-1]["phase"], "step": name, "depth": depth,
+        "start": time.perf_counter(), "start_mb": _memory_mb(peak=False),
+    }
+    records.append(record)
+    try:
+        yield
+    finally:
+        _close(record, time.perf_counter(), session.get(ENABLED_KEY, False))
+
+
+def rows(value):
+    # Notes len(value) on the innermost open step or phase and returns value unchanged
+    session = _session()
+    records = session.get(RECORDS_KEY) if session is not None else None
+    for record in reversed(records or []):
+        if "seconds" not in record:
+            record["rows"] = len(value)
+            break
+    return value
+
+
+def phase_records() -> list:
+    # Records of the last run; the phase still open when the script ended is closed now
+    session = _session()
+    if session is None:
+        return []
+    return list(close_records(session.get(RECORDS_KEY, []), log=session.get(ENABLED_KEY, False)))
+
+
+def show_profile():
+    # Sidebar breakdown of the run, in profiling mode only. Called at the bottom of the pages
+    session = _session()
+    if session is None or not session.get(ENABLED_KEY):
+        return
+    records = phase_records()
+    if not records:
+        return
+    df = pd.DataFrame(records).reindex(columns=["phase", "step", "depth", "seconds", "rows", "peak_mb", "alloc_mb"])
+    is_step = df["step"].notna()
+    total = df.loc[~is_step, "seconds"].sum()
+    # Each phase, then its steps in the order they ran
+    df["step"] = df["depth"].fillna(0).astype(int).map(lambda depth: "· " * depth) + df["step"].fillna("")
+    df = df.assign(order=df["phase"].map(PHASES.index), is_step=is_step)
+    df = df.sort_values(["order", "is_step"], kind="stable")
+    df = df.drop(columns=["depth", "order", "is_step"]).round({"seconds": 3}).rename(columns={
+        "phase": "Phase", "step": "Step", "seconds": "Seconds", "rows": "Rows",
+        "peak_mb": "Peak MB", "alloc_mb": "Allocated MB",
+    })
+    with st.sidebar.expander("⏱️ Profiling", expanded=True):
+        st.caption(f"{total:.3f} s for this run")
+        if tracemalloc.is_tracing():
+            st.caption("Memory is shared by all the sessions of the server: the MB columns are approximate.")
+        st.dataframe(df.astype({"Rows": "Int64"}).set_index("Phase"), use_container_width=True)
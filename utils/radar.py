@@ -0,0 +1,128 @@
+# Percentile radar charts of players or teams, and the stats shown on them for each position.
+# The "Image" mode draws the chart with matplotlib once per distinct chart (features, names and
+# values) and caches the PNG; the figure is closed as soon as it is saved. The "Interactive" mode
+# sends the values to the browser as a plotly chart, which is drawn client-side, so the server does
+# no rasterization at all.
+# matplotlib and plotly take about a second to import: they are imported by the chart that uses them,
+# the first time it is drawn, not when a page starts.
+import io
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import CACHE_ENTRIES
+
+RADAR_MODES = ("Image", "Interactive")
+FIGURE_SIZE = (6, 6)
+DPI = 200
+
+
+# ------------------------- Features -------------------------
+# Percentile stats shown on the radar of each position
+def get_features_for_players(positions: list) -> list:
+    features = set()
+    for pos in positions:
+        if pos in ['FW', 'MO']:
+            features.update([
+                'Goals', 'Efficiency', '% Take-Ons', 'Actions created',
+                'Expected Assists (xA)', "Actions in the Penalty Area", 'Key Passes',
+                '% Aerial Duels', 'Progressive Actions (Total)', 'Successful Take-Ons'
+            ])
+        elif pos == 'MF':
+            features.update([
+                'Progressive Actions (Total)', 'Interceptions', 'Tackles Won',
+                'Blocks', 'Ball Recoveries', 'Key Passes',
+                'Fouls Committed', '% Tackles/Duels', 'Touches Middle Third', '% Aerial Duels'
+            ])
+        elif pos == 'DF':
+            features.update([
+                'Clearances', 'Blocks', 'Interceptions', '% Aerial Duels',
+                'Touches', 'Fouls Committed', 'Aerial Duels Won',
+                'Progressive Passes', 'Ball Recoveries', '% Tackles/Duels'
+            ])
+    return list(features)
+
+
+def get_features_for_goalkeepers() -> list:
+    return [
+        'Clean Sheets', 'Crosses Stopped', 'Sweeper Actions', 'Saves',
+        'Goals Against', 'Efficiency', 'Penalties Winner', '% Saves', '% Long Passes', 
+        '% Crosses Stopped'
+    ]
+
+
+def get_features(positions: list) -> list:
+    if 'GK' in positions:
+        return get_features_for_goalkeepers()
+    else:
+        return get_features_for_players(positions)
+
+
+# ------------------------- Charts -------------------------
+def select_radar_mode(label: str = "Radar chart") -> str:
+    return st.sidebar.radio(label, RADAR_MODES, horizontal=True)
+
+
+def radar_series(df: pd.DataFrame, key_column: str, entities: list, features: list) -> tuple:
+    # ((name, values), ...) for the entities with a value for every feature, and the names left out
+    series, missing = [], []
+    for entity in entities:
+        values = df.loc[df[key_column] == entity, features].to_numpy(dtype=float).flatten()
+        if len(values) != len(features):
+            missing.append(entity)
+            continue
+        series.append((str(entity), tuple(values.tolist())))
+    return tuple(series), missing
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def radar_png(features: tuple, series: tuple) -> bytes:
+    import matplotlib.pyplot as plt
+
+    angles = np.linspace(0, 2 * np.pi, len(features), endpoint=False).tolist()
+    angles += angles[:1]
+
+    fig, ax = plt.subplots(figsize=FIGURE_SIZE, subplot_kw={"projection": "polar"})
+    try:
+        for name, values in series:
+            values = list(values) + [values[0]]
+            ax.plot(angles, values, label=name, linewidth=2)
+            ax.fill(angles, values, alpha=0.1)
+
+        ax.set_xticks(angles[:-1])
+        ax.set_xticklabels(features, fontsize=10)
+        ax.set_yticklabels([])
+        ax.legend(loc="upper right", bbox_to_anchor=(1.3, 1.1))
+
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format="png", dpi=DPI, bbox_inches="tight")
+        return buffer.getvalue()
+    finally:
+        plt.close(fig)
+
+
+def radar_figure(features: tuple, series: tuple):
+    import plotly.graph_objects as go
+
+    fig = go.Figure()
+    for name, values in series:
+        fig.add_trace(go.Scatterpolar(
+            r=list(values) + [values[0]], theta=list(features) + [features[0]],
+            name=name, fill="toself", opacity=0.6,
+        ))
+    fig.update_layout(
+        polar={"radialaxis": {"range": [0, 100], "showticklabels": False}},
+        legend={"orientation": "h"},
+        margin={"l": 40, "r": 40, "t": 40, "b": 40},
+    )
+    return fig
+
+
+def show_radar(features: list, series: tuple, mode: str = RADAR_MODES[0]):
+    if not series:
+        return
+    if mode == "Interactive":
+        st.plotly_chart(radar_figure(tuple(features), series))
+    else:
+        st.image(radar_png(tuple(features), series))
@@ -0,0 +1,131 @@
+# python -m utils.rating bench [season_code] [--rows N]
+# python -m utils.rating fit [season_code]
+# Batch match-rating engine: every player-match row of a season is rated in one vectorized pass.
+# A raw score is the weighted sum of the match stats (weights by position) plus a playing-time
+# adjustment (by minutes band). Raw scores are then standardized within each position so that the
+# season's ratings have a mean of 6.5 and a standard deviation of 0.7, like the published ratings.
+# Only goalkeepers are rated: their weights are fitted on the published ratings, and clean/ has no
+# outfield match stats to fit the other positions on. Rows of other positions are left unrated.
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from utils.data import DEFAULT_SEASON, SEASONS, load_clean, load_ratings
+
+RATING_MEAN = 6.5
+RATING_STD = 0.7
+
+# Players below these minutes are not rated
+MIN_MINUTES = {"GK": 30}
+DEFAULT_MIN_MINUTES = 20
+
+# ------------------------- Weighting tables -------------------------
+POSITION_WEIGHTS = {
+    # Fitted on the 2024-2025 goalkeeper ratings with fit_weights()
+    "GK": {
+        "Goals Against": -0.506, "Saves": 0.096, "Post-Shot Expected Goals (PSxG)": 0.362,
+        "Save Efficiency": 0.029, "Clean Sheets": 0.527, "Shots on Target Against": -0.018,
+        "Completed Long Passes": 0.026, "Crosses Stopped": 0.063,
+        "Defensive Actions Outside Penalty Area": 0.072,
+    },
+}
+
+# Raw-score adjustment by minutes band (lower bound of each band, in minutes)
+MINUTES_BANDS = [0, 45, 60, 75, 90]
+MINUTES_WEIGHTS = {
+    "GK": [-0.1, -0.1, -0.05, 0.0, 0.0],
+}
+
+
+# ------------------------- Engine -------------------------
+def weight_matrix(position_weights):
+    positions = list(position_weights)
+    stats = sorted(set().union(*position_weights.values()))
+    weights = np.array([[position_weights[pos].get(stat, 0.0) for stat in stats] for pos in positions])
+    return positions, stats, weights
+
+
+def rate_matches(df: pd.DataFrame, position_weights: dict = POSITION_WEIGHTS, minutes_weights: dict = MINUTES_WEIGHTS) -> pd.Series:
+    positions, stats, weights = weight_matrix(position_weights)
+    pos_idx = pd.Categorical(df["Position"], categories=positions).codes
+    known = pos_idx >= 0
+
+    # Stats missing from the frame count as 0
+    values = df.reindex(columns=stats).astype(float).fillna(0).to_numpy()
+    raw = np.einsum("ij,ij->i", values, weights[pos_idx])
+
+    minutes = df["Minutes"].to_numpy(dtype=float)
+    band_idx = np.searchsorted(MINUTES_BANDS, minutes, side="right") - 1
+    bonus = np.array([minutes_weights.get(pos, [0.0] * len(MINUTES_BANDS)) for pos in positions])
+    raw += bonus[pos_idx, np.clip(band_idx, 0, None)]
+
+    min_minutes = np.array([MIN_MINUTES.get(pos, DEFAULT_MIN_MINUTES) for pos in positions])
+    rated = known & (minutes >= min_minutes[pos_idx])
+
+    # Standardize within each position over the rated rows
+    n_pos = len(positions)
+    counts = np.bincount(pos_idx[rated], minlength=n_pos)
+    means = np.bincount(pos_idx[rated], weights=raw[rated], minlength=n_pos) / np.maximum(counts, 1)
+    squares = np.bincount(pos_idx[rated], weights=(raw[rated] - means[pos_idx[rated]]) ** 2, minlength=n_pos)
+    stds = np.sqrt(squares / np.maximum(counts, 1))
+    stds[stds == 0] = 1.0
+
+    rating = RATING_MEAN + RATING_STD * (raw - means[pos_idx]) / stds[pos_idx]
+    rating[~rated] = np.nan
+    return pd.Series(np.round(rating, 2), index=df.index, name="Rating")
+
+
+def fit_weights(df_clean: pd.DataFrame, df_ratings: pd.DataFrame, position: str, stats: list) -> dict:
+    # Least-squares weights reproducing the published ratings of one position (up to the standardization)
+    keys = ["Player", "Game Week", "Team", "League", "Minutes", "Position"]
+    df = df_clean[df_clean["Position"] == position].merge(df_ratings, on=keys, how="inner")
+    values = df.reindex(columns=stats).astype(float).fillna(0).to_numpy()
+    design = np.column_stack([np.ones(len(df)), values])
+    coefs, *_ = np.linalg.lstsq(design, df["Rating"].to_numpy(), rcond=None)
+    fitted = design @ coefs
+    r2 = 1 - ((df["Rating"] - fitted) ** 2).sum() / ((df["Rating"] - df["Rating"].mean()) ** 2).sum()
+    weights = {stat: round(float(coef), 3) for stat, coef in zip(stats, coefs[1:])}
+    return {"weights": weights, "r2": round(float(r2), 3), "rows": len(df)}
+
+
+# ------------------------- Command line -------------------------
+def load_rated_rows(season_code):
+    # clean/ rows of the positions with weights: the goalkeepers
+    return load_clean(season_code, goalkeepers=True).assign(Position="GK")
+
+
+def bench(season_code, rows=None, repeat=5):
+    df = load_rated_rows(season_code)
+    if rows:
+        df = pd.concat([df] * (rows // len(df) + 1), ignore_index=True).head(rows)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        rate_matches(df)
+        timings.append(time.perf_counter() - start)
+    best = min(timings)
+    print(f"csv{season_code}: rated {len(df)} rows in {best * 1000:.1f} ms ({len(df) / best:,.0f} rows/s, best of {repeat})")
+
+
+def fit(season_code):
+    df_clean = load_rated_rows(season_code)
+    df_ratings = load_ratings(season_code, goalkeepers=True)
+    for position in sorted(set(df_clean["Position"].dropna().unique()) & set(POSITION_WEIGHTS)):
+        stats = list(POSITION_WEIGHTS[position])
+        result = fit_weights(df_clean, df_ratings, position, stats)
+        print(f"{position}: R2={result['r2']} on {result['rows']} rows")
+        print(f"    {result['weights']}")
+
+
+if __name__ == "__main__":
+    # The value after --rows is not a positional argument
+    args = [arg for i, arg in enumerate(sys.argv[1:], 1) if not arg.startswith("--") and sys.argv[i - 1] != "--rows"]
+    command = args[0] if args else "bench"
+    season_code = args[1] if len(args) > 1 else SEASONS[DEFAULT_SEASON]
+    if command == "fit":
+        fit(season_code)
+    else:
+        rows = int(sys.argv[sys.argv.index("--rows") + 1]) if "--rows" in sys.argv else None
+        bench(season_code, rows)
@@ -0,0 +1,129 @@
+# python -m utils.schema [season_code ...]
+# Column schema of the season files. Identity columns are loaded as categoricals, stats as 32-bit
+# numbers, Age as whole years and Nation as its country code, once, when a file is read.
+# The command line prints the memory used by each file with the default dtypes and with the schema.
+import os
+import sys
+
+import pandas as pd
+
+from utils.profiling import rows, step
+
+# Repeated labels: one small integer code per row instead of one Python string
+CATEGORY_COLUMNS = ["Player", "Team", "Squad", "League", "Position", "Game Week", "Opponent", "Home/Away"]
+NATION_COLUMNS = ["Nation", "Nationality"]
+AGE_DTYPE = "Int8"
+
+# Columns every file of a folder must have, checked when they are read
+REQUIRED_COLUMNS = {
+    "ratings": ["Player", "Game Week", "Position", "Team", "League", "Minutes", "Rating"],
+    "clean": ["Player", "Game Week", "Team", "League", "Minutes"],
+    "centiles": ["Player", "Position", "Minutes Played"],
+    "metrics": ["Minutes Played"],
+    "estimates": ["Minutes Played"],
+    "teams": ["Team"],
+    "leagues_games": ["Game Week", "Home Team", "Away Team"],
+    "facts": ["Player", "Game Week", "Team", "League", "Minutes", "Position"],
+    "aggregates": ["League", "Position", "Player", "Rating Sum", "Rated Matches"],
+}
+
+
+# ------------------------- Parsing -------------------------
+def parse_age(age: pd.Series) -> pd.Series:
+    # "26-152" (years-days) -> 26; ages already parsed are kept
+    if pd.api.types.is_numeric_dtype(age):
+        return age.astype(AGE_DTYPE)
+    years = age.astype(str).str.split("-").str[0]
+    return pd.to_numeric(years, errors="coerce").astype(AGE_DTYPE)
+
+
+def parse_nation(nation: pd.Series) -> pd.Series:
+    # "fr FRA" -> "FRA"; codes already parsed are kept
+    return nation.astype(object).str.split(" ").str[-1]
+
+
+# ------------------------- Schema -------------------------
+def validate_columns(df: pd.DataFrame, parts: tuple, columns: tuple = None):
+    required = REQUIRED_COLUMNS.get(parts[0], [])
+    if columns is not None:
+        required = [col for col in required if col in columns]
+    missing = [col for col in required if col not in df.columns]
+    if missing:
+        raise ValueError(f"{os.path.join(*parts)} is missing columns: {', '.join(missing)}")
+
+
+def apply_schema(df: pd.DataFrame) -> pd.DataFrame:
+    for col in df.columns:
+        if col == "Age":
+            df[col] = parse_age(df[col])
+        elif col in NATION_COLUMNS:
+            df[col] = parse_nation(df[col]).astype("category")
+        elif col in CATEGORY_COLUMNS:
+            df[col] = df[col].astype("category")
+        elif pd.api.types.is_float_dtype(df[col]):
+            df[col] = df[col].astype("float32")
+        elif pd.api.types.is_integer_dtype(df[col]) and not pd.api.types.is_bool_dtype(df[col]):
+            df[col] = df[col].astype("int32")
+    return df
+
+
+def concat_frames(frames: list) -> pd.DataFrame:
+    # pd.concat keeps a categorical column only when every frame has the same categories:
+    # they are aligned on their sorted union first, so Player, Team... stay compact after the concat
+    with step("concat"):
+        return rows(_concat_frames(frames))
+
+
+def _concat_frames(frames: list) -> pd.DataFrame:
+    frames = [frame.copy() for frame in frames]
+    categorical = {
+        col for frame in frames for col in frame.columns if isinstance(frame[col].dtype, pd.CategoricalDtype)
+    }
+    for col in categorical:
+        categories = pd.Index([])
+        for frame in frames:
+            if col in frame.columns:
+                values = frame[col].cat.categories if isinstance(frame[col].dtype, pd.CategoricalDtype) else frame[col].dropna().unique()
+                categories = categories.union(pd.Index(values))
+        for frame in frames:
+            if col in frame.columns:
+                frame[col] = pd.Categorical(frame[col], categories=categories)
+    return pd.concat(frames, ignore_index=True)
+
+
+# ------------------------- Memory -------------------------
+def frame_memory(df: pd.DataFrame) -> float:
+    # Memory held by a frame, strings included, in MB
+    return df.memory_usage(deep=True).sum() / 1e6
+
+
+def memory_report(season_code: str) -> pd.DataFrame:
+    from utils.data import season_folder
+
+    folder = season_folder(season_code)
+    rows = []
+    for root, _, files in os.walk(folder):
+        for file_name in sorted(files):
+            if not file_name.endswith(".csv"):
+                continue
+            df = pd.read_csv(os.path.join(root, file_name))
+            default = frame_memory(df)
+            rows.append({
+                "File": os.path.relpath(os.path.join(root, file_name), folder),
+                "Rows": len(df),
+                "Default MB": round(default, 2),
+                "Typed MB": round(frame_memory(apply_schema(df)), 2),
+            })
+    return pd.DataFrame(rows, columns=["File", "Rows", "Default MB", "Typed MB"])
+
+
+if __name__ == "__main__":
+    from utils.data import SEASONS
+
+    for season_code in sys.argv[1:] or list(SEASONS.values()):
+        report = memory_report(season_code)
+        if report.empty:
+            print(f"csv{season_code}: no files")
+            continue
+        print(f"csv{season_code}: {report['Default MB'].sum():.1f} MB -> {report['Typed MB'].sum():.1f} MB")
+        print(report.to_string(index=False))
@@ -0,0 +1,94 @@
+# Player name search. Player and team names are normalized (accents, case and punctuation removed)
+# and indexed by the trigrams of their words, padded at the start of each word so that a prefix
+# query ("aar") shares all its trigrams with the names it starts. A query only scores the names found
+# in the posting lists of its own trigrams, so a misspelt name still ranks its closest matches first,
+# and the page only receives the few best names instead of the whole player list.
+import unicodedata
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import CACHE_ENTRIES, folder_version, load_centiles
+from utils.profiling import step
+
+MAX_MATCHES = 30
+# Share of the query's trigrams a name must have to be a match
+MIN_OVERLAP = 0.5
+PAD = "  "
+
+
+def normalize(text: str) -> str:
+    # "Aarón Martín" -> "aaron martin"
+    text = unicodedata.normalize("NFKD", str(text))
+    text = "".join(char for char in text if not unicodedata.combining(char)).lower()
+    return " ".join("".join(char if char.isalnum() else " " for char in text).split())
+
+
+def trigrams(text: str) -> set:
+    grams = set()
+    for word in text.split():
+        word = PAD + word
+        grams.update(word[i:i + 3] for i in range(len(word) - 2))
+    return grams
+
+
+def build_name_index(df: pd.DataFrame) -> dict:
+    # df has one row per player with Player, Team, Position and Minutes Played
+    df = df.sort_values("Minutes Played", ascending=False, kind="stable").reset_index(drop=True)
+    words = [normalize(f"{player} {team}").split() for player, team in zip(df["Player"], df["Team"])]
+    postings = {}
+    for i, name_words in enumerate(words):
+        for gram in trigrams(" ".join(name_words)):
+            postings.setdefault(gram, []).append(i)
+    return {
+        "players": df["Player"].astype(str).to_numpy(),
+        "positions": df["Position"].astype(str).to_numpy(),
+        "words": words,
+        "postings": {gram: np.array(ids, dtype=np.int32) for gram, ids in postings.items()},
+    }
+
+
+def load_name_index(season_code: str, leagues_name: str, goalkeepers: bool = False) -> dict:
+    # Shared between sessions: must not be modified
+    return _load_name_index(season_code, leagues_name, goalkeepers, folder_version(season_code, "centiles"))
+
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _load_name_index(season_code: str, leagues_name: str, goalkeepers: bool, version: float) -> dict:
+    df = load_centiles(
+        season_code, leagues_name, goalkeepers=goalkeepers,
+        columns=("Player", "Team", "Position", "Minutes Played")
+    )
+    return build_name_index(df.drop_duplicates("Player"))
+
+
+def search_players(index: dict, query: str, positions: list = None, limit: int = MAX_MATCHES) -> list:
+    # Best matching players, most played first among equal scores. An empty query returns the most
+    # played players.
+    allowed = np.ones(len(index["players"]), dtype=bool)
+    if positions:
+        allowed = np.isin(index["positions"], positions)
+
+    query = normalize(query)
+    if not query:
+        return index["players"][allowed][:limit].tolist()
+
+    with step("name search"):
+        grams = trigrams(query)
+        counts = np.zeros(len(index["players"]), dtype=np.int32)
+        for gram in grams:
+            ids = index["postings"].get(gram)
+            if ids is not None:
+                counts[ids] += 1
+
+        candidates = np.flatnonzero(allowed & (counts >= max(1, MIN_OVERLAP * len(grams))))
+        # Each query word that starts a word of the name counts as much as the whole trigram overlap
+        query_words = query.split()
+        scores = []
+        for i in candidates:
+            prefixes = sum(any(word.startswith(q) for word in index["words"][i]) for q in query_words)
+            scores.append(prefixes + counts[i] / len(grams))
+        # Rows are sorted by minutes played: a stable sort keeps the most played first among ties
+        order = np.argsort(-np.array(scores), kind="stable")[:limit]
+        return index["players"][candidates[order]].tolist()
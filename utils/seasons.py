@@ -0,0 +1,33 @@
+# Cross-season access. A table is scanned one season at a time through its usual loader, so only the
+# requested columns are read per season, and the where filter is handed to the reader: the Parquet
+# copies only return the requested rows. The seasons are then stacked with a Season column.
+# Seasons without the file are skipped.
+import pandas as pd
+
+from utils.data import SEASONS
+from utils.schema import concat_frames
+
+
+def season_labels(newest_first: bool = False) -> list:
+    return sorted(SEASONS, reverse=newest_first)
+
+
+def iter_seasons(loader, *args, columns: tuple = None, where: dict = None, seasons: list = None):
+    # Yields (season label, frame) for every season where the table exists, oldest first.
+    # where maps a column to the values to keep, e.g. {"Player": ["Jonathan David"]}.
+    for season in seasons or season_labels():
+        try:
+            df = loader(SEASONS[season], *args, columns=columns, where=where)
+        except FileNotFoundError:
+            continue
+        yield season, df
+
+
+def scan_seasons(loader, *args, columns: tuple = None, where: dict = None, seasons: list = None) -> pd.DataFrame:
+    frames = [
+        df.assign(Season=season)
+        for season, df in iter_seasons(loader, *args, columns=columns, where=where, seasons=seasons)
+    ]
+    if not frames:
+        return pd.DataFrame(columns=list(columns or []) + ["Season"])
+    return concat_frames(frames)
@@ -0,0 +1,72 @@
+# Similar players. For each season, league group and position, the percentiles of the position's
+# radar stats are indexed once in a KD-tree (scikit-learn) and cached; a query then walks the tree
+# instead of computing the distance to every player. Percentiles are on the same 0-100 scale in every
+# centiles file, so a player can also be searched among the players of the other league group.
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.data import CACHE_ENTRIES, folder_version, load_centiles
+from utils.profiling import rows, step
+from utils.radar import get_features
+
+# A missing percentile (e.g. % Take-Ons without any attempt) counts as the median
+MISSING_PERCENTILE = 50.0
+LEAF_SIZE = 30
+ID_COLUMNS = ["Player", "Team", "Age", "Minutes Played"]
+
+
+def position_features(position: str) -> list:
+    return sorted(get_features([position]))
+
+
+def load_similarity_index(season_code: str, leagues_name: str, position: str) -> tuple:
+    # (players of the position indexed by Player, their percentile vectors, KD-tree over the vectors).
+    # The objects are shared between sessions and must not be modified.
+    with step("similarity index"):
+        return _load_similarity_index(season_code, leagues_name, position, folder_version(season_code, "centiles"))
+
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _load_similarity_index(season_code: str, leagues_name: str, position: str, version: float) -> tuple:
+    from sklearn.neighbors import KDTree
+
+    df = load_centiles(season_code, leagues_name, "centiles", goalkeepers=position == "GK")
+    features = [col for col in position_features(position) if col in df.columns]
+    df_players = df.loc[df["Position"] == position, ID_COLUMNS + features].drop_duplicates("Player")
+    df_players = df_players.astype({"Player": str}).set_index("Player")
+
+    vectors = df_players[features].to_numpy(dtype=float)
+    vectors[np.isnan(vectors)] = MISSING_PERCENTILE
+    return df_players, vectors, KDTree(vectors, leaf_size=LEAF_SIZE)
+
+
+def similar_players(season_code: str, leagues_name: str, position: str, player: str, n: int = 10,
+                    search_group: str = None, min_minutes: int = 0) -> pd.DataFrame:
+    # The n players of search_group (the player's group by default) closest to the player's percentiles,
+    # with a Similarity of 100 for identical percentiles and 0 for the farthest possible ones
+    df_own, _, _ = load_similarity_index(season_code, leagues_name, position)
+    df_search, _, tree = load_similarity_index(season_code, search_group or leagues_name, position)
+    if player not in df_own.index or not len(df_search):
+        return df_search.iloc[:0]
+
+    features = list(df_search.columns.drop(ID_COLUMNS[1:]))
+    target = df_own.loc[player].reindex(features).to_numpy(dtype=float)
+    target[np.isnan(target)] = MISSING_PERCENTILE
+    max_distance = 100 * np.sqrt(len(features))
+    minutes = df_search["Minutes Played"].to_numpy()
+
+    # Nearest first; the search widens until n players pass the minutes filter
+    with step("nearest players"):
+        k = min(4 * n + 1, len(df_search))
+        while True:
+            distances, indices = tree.query(target[None, :], k=k)
+            distances, indices = distances[0], indices[0]
+            keep = (df_search.index[indices] != player) & (minutes[indices] >= min_minutes)
+            if keep.sum() >= n or k == len(df_search):
+                break
+            k = min(4 * k, len(df_search))
+
+        df_similar = df_search.iloc[indices[keep][:n]].copy()
+        df_similar.insert(0, "Similarity", np.round(100 * (1 - distances[keep][:n] / max_distance), 1))
+        return rows(df_similar)
@@ -0,0 +1,119 @@
+# python -m utils.snapshots [season_code ...]
+# Player stats as of a matchday. The clean/ match rows are summed once per stint (Player, Position,
+# Team, League) and matchday, like utils.ingest sums a new matchday, and accumulated over the season:
+# one row per stint and matchday played (float32 counts), sorted by stint then matchday. The totals as of
+# matchday J are the last row of each stint at or before J; they go through the same steps as the
+# ingested files (player aggregates, per 90, percentiles within each position, indices), on demand.
+# The indices use the INDEX_STATS groups of utils.ingest: an estimate that does not match the official
+# metrics/ files, even after the last matchday, so pages show it apart from them.
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+from utils.aggregates import extract_matchday_num
+from utils.data import CACHE_ENTRIES, SEASONS, folder_version, load_clean
+from utils.ingest import (
+    INDEX_STATS, INDEX_STATS_GK, STINT_KEYS, centiles, indices, is_rate_column, per_90, player_aggregates,
+    stat_columns, summarize_rows,
+)
+from utils.profiling import rows, step
+
+IDENTITY_COLUMNS = ["Player", "Nation", "Position", "Team", "Age", "Matches Played", "Minutes Played"]
+
+
+# ------------------------- Cumulative totals -------------------------
+def load_cumulative_stats(season_code: str, goalkeepers: bool = False) -> tuple:
+    # (cumulative rows with STINT_KEYS, Stint and Matchday columns, matchdays in order, stat columns).
+    # The objects are shared between sessions and must not be modified.
+    with step("cumulative stats"):
+        return _load_cumulative_stats(season_code, goalkeepers, folder_version(season_code, "clean"))
+
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _load_cumulative_stats(season_code: str, goalkeepers: bool, version: float) -> tuple:
+    df = load_clean(season_code, goalkeepers=goalkeepers)
+    df = df[df["Game Week"].notna()]
+    if goalkeepers:
+        df = df.assign(Position="GK")
+    df = df.astype({key: str for key in STINT_KEYS + ["Game Week"]})
+    stats = stat_columns(df)
+    matchdays = sorted(df["Game Week"].unique(), key=extract_matchday_num)
+
+    frames = []
+    for game_week, df_day in df.groupby("Game Week"):
+        frames.append(summarize_rows(df_day, stats).assign(Matchday=matchdays.index(game_week)))
+    df_cum = pd.concat(frames).reset_index().sort_values(STINT_KEYS + ["Matchday"], kind="stable", ignore_index=True)
+
+    # Running sums within each stint; a matchday without a stat keeps the previous total
+    grouped = df_cum.groupby(STINT_KEYS, sort=False)
+    df_cum["Stint"] = grouped.ngroup().astype("int32")
+    sums = stats + ["Matches Played", "Minutes"]
+    df_cum[sums] = grouped[sums].cumsum().groupby(df_cum["Stint"]).ffill()
+    # Counts are exact in float32; minute-weighted rates stay float64
+    df_cum = df_cum.astype({col: "float32" for col in sums if not is_rate_column(col)})
+    df_cum["Age"] = grouped["Age"].cummax()
+    df_cum[STINT_KEYS + ["Nationality"]] = df_cum[STINT_KEYS + ["Nationality"]].astype("category")
+    return df_cum, matchdays, stats
+
+
+def clean_matchdays(season_code: str) -> list:
+    # Game weeks of the outfield players' clean/ rows, in order; none when the season has no clean/ rows
+    try:
+        game_weeks = load_clean(season_code, columns=("Game Week",))["Game Week"]
+    except FileNotFoundError:
+        return []
+    return sorted(game_weeks.dropna().astype(str).unique(), key=extract_matchday_num)
+
+
+def totals_as_of(df_cum: pd.DataFrame, matchday: int) -> pd.DataFrame:
+    # Last row of each stint at or before the matchday, indexed like the running totals of utils.ingest
+    df = df_cum[df_cum["Matchday"] <= matchday]
+    stint = df["Stint"].to_numpy()
+    last = np.append(stint[1:] != stint[:-1], True) if len(stint) else np.zeros(0, dtype=bool)
+    return df[last].drop(columns=["Stint", "Matchday"]).set_index(STINT_KEYS)
+
+
+# ------------------------- Snapshots -------------------------
+def player_snapshot(season_code: str, matchday: str, goalkeepers: bool = False) -> tuple:
+    # (adjusted, centiles, metrics) frames as of the matchday, with the columns of the ingested files
+    with step("snapshot"):
+        return _player_snapshot(season_code, matchday, goalkeepers, folder_version(season_code, "clean"))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _player_snapshot(season_code: str, matchday: str, goalkeepers: bool, version: float) -> tuple:
+    df_cum, matchdays, stats = load_cumulative_stats(season_code, goalkeepers)
+    df_totals = totals_as_of(df_cum, matchdays.index(matchday) if matchday in matchdays else len(matchdays) - 1)
+    # Computed in float64 like the ingested files
+    df_totals = df_totals.astype({col: "float64" for col in stats + ["Matches Played", "Minutes"]})
+
+    df_adj = per_90(player_aggregates(df_totals, stats), stats)
+    df_cent = centiles(df_adj, stats)
+    df_metrics = indices(df_cent, INDEX_STATS_GK if goalkeepers else INDEX_STATS, IDENTITY_COLUMNS)
+    return rows(df_adj), rows(df_cent), rows(df_metrics)
+
+
+def metrics_as_of(season_code: str, matchday: str) -> pd.DataFrame:
+    # Outfield players and goalkeepers, like load_all_metrics
+    df_players = player_snapshot(season_code, matchday)[2]
+    df_goalkeepers = player_snapshot(season_code, matchday, goalkeepers=True)[2]
+    return pd.concat([df_players, df_goalkeepers], ignore_index=True)
+
+
+if __name__ == "__main__":
+    for season_code in sys.argv[1:] or list(SEASONS.values()):
+        for goalkeepers in (False, True):
+            start = time.perf_counter()
+            try:
+                df_cum, matchdays, stats = load_cumulative_stats(season_code, goalkeepers)
+            except FileNotFoundError as e:
+                print(f"csv{season_code}: skipped ({e})")
+                break
+            memory = df_cum.memory_usage(deep=True).sum() / 2**20
+            print(
+                f"csv{season_code}{' gk' if goalkeepers else ''}: {len(df_cum)} rows x {len(stats)} stats over "
+                f"{len(matchdays)} matchdays, {memory:.1f} MB, built in {time.perf_counter() - start:.2f} s"
+            )
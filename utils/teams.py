@@ -0,0 +1,76 @@
+# Team stats over any window of matchdays, or over home or away matches only. The clean/ rows of
+# outfield players and goalkeepers are summed once per team and match, like utils.ingest sums the
+# matches it ingests, and cached. A window adds up the matches it covers in one groupby and goes
+# through the steps of the ingested teams files: aggregates, per match values and percentiles among
+# all the teams of the window.
+import pandas as pd
+import streamlit as st
+
+from utils.aggregates import extract_matchday_num
+from utils.data import CACHE_ENTRIES, folder_version, load_clean
+from utils.fixtures import FIXTURE_KEYS, load_fixture_index
+from utils.ingest import centiles, per_90, stat_columns, summarize_team_rows, team_aggregates
+from utils.profiling import rows, step
+
+VENUES = ("All", "Home", "Away")
+MATCH_COLUMNS = FIXTURE_KEYS + ["Matchday", "Home/Away"]
+
+
+# ------------------------- Team matches -------------------------
+def load_team_matches(season_code: str) -> pd.DataFrame:
+    # One row per (League, Game Week, Team) with the team's summed stats, Minutes and Age Minutes.
+    # Shared between sessions: must not be modified.
+    with step("team matches"):
+        return rows(_load_team_matches(season_code, folder_version(season_code, "clean", "leagues_games")))
+
+
+@st.cache_resource(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _load_team_matches(season_code: str, version: float) -> pd.DataFrame:
+    frames = []
+    for goalkeepers in (False, True):
+        try:
+            df = load_clean(season_code, goalkeepers=goalkeepers)
+        except FileNotFoundError:
+            continue
+        df = df.astype({key: str for key in FIXTURE_KEYS})
+        frames.append(summarize_team_rows(df, stat_columns(df), by=FIXTURE_KEYS))
+    if not frames:
+        raise FileNotFoundError(f"csv{season_code} has no clean/ data")
+
+    # A match is one row even when both the outfield and goalkeeper files have it
+    df_matches = pd.concat(frames).groupby(level=FIXTURE_KEYS, sort=False).sum(min_count=1).reset_index()
+    df_matches.insert(3, "Matchday", df_matches["Game Week"].map(extract_matchday_num))
+    df_venues = load_fixture_index(season_code)[FIXTURE_KEYS + ["Home/Away"]].astype(str)
+    df_matches = df_matches.merge(df_venues, on=FIXTURE_KEYS, how="left")
+    return df_matches[MATCH_COLUMNS + [col for col in df_matches.columns if col not in MATCH_COLUMNS]]
+
+
+# ------------------------- Windows -------------------------
+def team_window(season_code: str, first: str = None, last: str = None, venue: str = "All") -> tuple:
+    # (aggregated, adjusted, centiles) frames of the teams over the matchdays from first to last,
+    # with the columns of the ingested teams files
+    with step("team window"):
+        return _team_window(season_code, first, last, venue, folder_version(season_code, "clean", "leagues_games"))
+
+
+@st.cache_data(max_entries=CACHE_ENTRIES, show_spinner=False)
+def _team_window(season_code: str, first: str, last: str, venue: str, version: float) -> tuple:
+    df = load_team_matches(season_code)
+    mask = pd.Series(True, index=df.index)
+    if first is not None:
+        mask &= df["Matchday"] >= extract_matchday_num(first)
+    if last is not None:
+        mask &= df["Matchday"] <= extract_matchday_num(last)
+    if venue != "All":
+        mask &= df["Home/Away"] == venue
+    df = df[mask]
+
+    sums = [col for col in df.columns if col not in MATCH_COLUMNS]
+    df_totals = df.groupby("Team")[sums].sum(min_count=1)
+    df_totals["Matches Played"] = df.groupby("Team").size()
+
+    df_agg = team_aggregates(df_totals)
+    team_stats = [col for col in df_agg.columns if col not in ["Team", "Average Age", "Matches Played"]]
+    df_adj = per_90(df_agg, team_stats, minutes_col="Matches Played", scale=1)
+    df_cent = centiles(df_adj, team_stats, by=None)
+    return rows(df_agg), rows(df_adj), rows(df_cent)
@@ -0,0 +1,169 @@
+# python -m utils.warmup [season_code ...] [--all] [--workers N] [--check]
+# Warm-up of the shared caches. The first page run of a server process starts a background thread
+# that reads and parses the default season's tables with the same loaders (and columns) the pages
+# use, so the first visitors after a deploy find them in the st.cache_data caches instead of paying
+# the CSV parse. WARMUP=0 turns it off (benchmarks/pages.py does, to time cold runs) and WARMUP=all
+# warms every season. The command line runs the same loads in the foreground and prints their timings;
+# --check then runs them again and fails if any file has to be read again, i.e. was evicted from the cache.
+# The season files are independent: they are parsed concurrently by a pool of threads (one per core by
+# default), then the tables derived from them are built by the same pool. Threads rather than
+# processes, so that the frames land in this process's caches; the CSV and Parquet readers release
+# the GIL while they parse.
+import os
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import streamlit as st
+
+from utils.aggregates import load_matchday_sums, load_rating_aggregates
+from utils.data import (
+    DEFAULT_SEASON, LEAGUE_GROUPS, SEASONS, file_reads, season_path, read_season_table,
+    load_all_centiles, load_all_metrics, load_all_ratings, load_centiles, load_ratings, load_teams,
+)
+from utils.facts import load_match_facts
+from utils.fixtures import load_match_sheets
+from utils.players import load_league_teams, load_main_positions, load_player_dimension
+from utils.snapshots import load_cumulative_stats
+from utils.teams import load_team_matches
+
+WORKERS = os.cpu_count() or 1
+SEASON_FOLDERS = ("leagues_games", "ratings", "clean", "centiles", "metrics", "teams")
+
+
+def warmup_tasks(season_code: str) -> list:
+    # (name, function, args, kwargs) in the order of the pages' first reads
+    tasks = [
+        ("ratings", load_ratings, (season_code,), {}),
+        ("all ratings", load_all_ratings, (season_code,), {}),
+        ("main positions", load_main_positions, (season_code,), {}),
+        ("rating aggregates", load_rating_aggregates, (season_code,), {}),
+        ("matchday sums", load_matchday_sums, (season_code,), {}),
+        ("league teams", load_league_teams, (season_code,), {}),
+        ("match facts", load_match_facts, (season_code,), {}),
+        ("match sheets", load_match_sheets, (season_code,), {}),
+        ("team matches", load_team_matches, (season_code,), {}),
+        ("cumulative stats", load_cumulative_stats, (season_code,), {}),
+        ("cumulative stats gk", load_cumulative_stats, (season_code,), {"goalkeepers": True}),
+    ]
+    for leagues_name in LEAGUE_GROUPS.values():
+        tasks += [
+            (f"{leagues_name} dimension", load_player_dimension, (season_code, leagues_name), {}),
+            (f"{leagues_name} positions", load_all_centiles, (season_code, leagues_name, "adjusted"), {"columns": ("Position",)}),
+            (f"{leagues_name} metrics", load_all_metrics, (season_code, leagues_name), {}),
+        ]
+        for kind in ("centiles", "adjusted", "aggregated"):
+            tasks += [
+                (f"{leagues_name} {kind}", load_centiles, (season_code, leagues_name, kind), {}),
+                (f"{leagues_name} {kind} gk", load_centiles, (season_code, leagues_name, kind), {"goalkeepers": True}),
+                (f"{leagues_name} teams {kind}", load_teams, (season_code, leagues_name, kind), {}),
+            ]
+    return tasks
+
+
+def season_files(season_code: str) -> list:
+    # (folder, file name) of the season's CSV files read by the pages
+    files = []
+    for folder in SEASON_FOLDERS:
+        path = season_path(season_code, folder)
+        if os.path.isdir(path):
+            files += [(folder, name) for name in sorted(os.listdir(path)) if name.endswith(".csv")]
+    return files
+
+
+def read_files(files: list, workers: int = WORKERS) -> dict:
+    # {(season_code, folder, file name): frame} for the given (season_code, (folder, file name)),
+    # parsed concurrently; files that cannot be read are left out
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="read") as pool:
+        futures = {(season_code, *parts): pool.submit(read_season_table, season_code, *parts) for season_code, parts in files}
+    frames = {}
+    for key, future in futures.items():
+        try:
+            frames[key] = future.result()
+        except (FileNotFoundError, ValueError):
+            continue
+    return frames
+
+
+def timed(function, args: tuple, kwargs: dict) -> float | None:
+    start = time.perf_counter()
+    try:
+        function(*args, **kwargs)
+    except FileNotFoundError:
+        return None
+    return time.perf_counter() - start
+
+
+def warm_seasons(season_codes: list, workers: int = WORKERS) -> dict:
+    # Seconds taken by each load, keyed by (season_code, name), and by the file reads, keyed by
+    # (None, "files"); files missing from a season are skipped
+    start = time.perf_counter()
+    read_files([(season_code, parts) for season_code in season_codes for parts in season_files(season_code)], workers)
+    timings = {(None, "files"): time.perf_counter() - start}
+
+    # Then the tables derived from the files
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="warmup") as pool:
+        futures = {
+            (season_code, name): pool.submit(timed, function, args, kwargs)
+            for season_code in season_codes
+            for name, function, args, kwargs in warmup_tasks(season_code)
+        }
+    for key, future in futures.items():
+        seconds = future.result()
+        if seconds is not None:
+            timings[key] = seconds
+    return timings
+
+
+def evicted_reads(season_codes: list, workers: int = WORKERS) -> list:
+    # (season_code, parts, columns) of the reads missing from the cache when the warm-up runs again
+    before = file_reads.copy()
+    warm_seasons(season_codes, workers)
+    return list(file_reads - before)
+
+
+def warm_season(season_code: str, workers: int = WORKERS) -> dict:
+    return {name: seconds for (_, name), seconds in warm_seasons([season_code], workers).items()}
+
+
+def seasons_to_warm(season_code: str) -> list:
+    if os.environ.get("WARMUP") == "all":
+        return [code for code in SEASONS.values() if os.path.isdir(season_path(code, "ratings"))]
+    return [season_code]
+
+
+@st.cache_resource(show_spinner=False)
+def start_warmup(season_code: str = SEASONS[DEFAULT_SEASON]) -> threading.Thread | None:
+    # Started once per server process, whichever page is opened first
+    if os.environ.get("WARMUP") == "0":
+        return None
+    thread = threading.Thread(target=warm_seasons, args=(seasons_to_warm(season_code),), name="warmup", daemon=True)
+    thread.start()
+    return thread
+
+
+def option(name, default=None):
+    return sys.argv[sys.argv.index(name) + 1] if name in sys.argv else default
+
+
+if __name__ == "__main__":
+    workers = int(option("--workers", WORKERS))
+    args = [arg for i, arg in enumerate(sys.argv[1:], 1) if not arg.startswith("--") and sys.argv[i - 1] != "--workers"]
+    if "--all" in sys.argv:
+        os.environ["WARMUP"] = "all"
+    season_codes = args or seasons_to_warm(SEASONS[DEFAULT_SEASON])
+
+    start = time.perf_counter()
+    timings = warm_seasons(season_codes, workers)
+    print(f"{', '.join(f'csv{code}' for code in season_codes)} with {workers} worker(s): {time.perf_counter() - start:.2f} s")
+    print(f"    file reads: {timings.pop((None, 'files')):.2f} s")
+    for (season_code, name), seconds in sorted(timings.items(), key=lambda item: -item[1]):
+        print(f"    csv{season_code} {name}: {seconds:.2f} s")
+
+    if "--check" in sys.argv:
+        evicted = evicted_reads(season_codes, workers)
+        for season_code, parts, columns in evicted:
+            print(f"    evicted: csv{season_code}/{'/'.join(parts)} {list(columns) if columns else 'all columns'}")
+        print(f"{len(evicted)} of {len(file_reads)} warmed reads evicted from the cache")
+        sys.exit(1 if evicted else 0)